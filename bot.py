@@ -9,7 +9,7 @@ import yaml
 
 from core.irc_client import IRCClient
 from core.plugin_manager import PluginManager
-from core.utils import load_yaml_file, setup_logging, validate_config
+from core.utils import close_http_session, load_yaml_file, setup_logging, validate_config
 
 
 CONFIG_ENV_MAP = {
@@ -69,6 +69,7 @@ async def run_bot(config_path: Path) -> None:
         await client.start()
     finally:
         await client.stop()
+        close_http_session()
 
 
 def main() -> None:
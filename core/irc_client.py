@@ -6,7 +6,7 @@ import signal
 import ssl
 from asyncio import StreamReader, StreamWriter
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 
 import yaml
 
@@ -20,17 +20,26 @@ from .utils import (
     parse_irc_message,
 )
 
+# Config updates queued within this window are written to disk together.
+CONFIG_WRITE_DELAY_SECS = 0.05
+
 
 @dataclass
 class OwnerRecord:
     nick: str
     password: Optional[str] = None
     hosts: Set[str] = field(default_factory=set)
+    # Lower-cased copy of ``hosts`` so access checks are a set lookup;
+    # add_host keeps it in step.
+    _hosts_lower: Set[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._hosts_lower = {host.lower() for host in self.hosts}
 
     def has_host(self, ident_host: str) -> bool:
         candidate = ident_host.lower()
         # Direct match
-        if any(existing.lower() == candidate for existing in self.hosts):
+        if candidate in self._hosts_lower:
             return True
         # Try matching with/without ~ prefix (some IRC servers use ~ for no ident)
         if "@" in candidate:
@@ -38,12 +47,12 @@ class OwnerRecord:
             # Try without ~ prefix
             if ident_part.startswith("~"):
                 alt_candidate = f"{ident_part[1:]}@{host_part}"
-                if any(existing.lower() == alt_candidate for existing in self.hosts):
+                if alt_candidate in self._hosts_lower:
                     return True
             # Try with ~ prefix
             else:
                 alt_candidate = f"~{ident_part}@{host_part}"
-                if any(existing.lower() == alt_candidate for existing in self.hosts):
+                if alt_candidate in self._hosts_lower:
                     return True
         return False
 
@@ -54,6 +63,7 @@ class OwnerRecord:
         if self.has_host(ident_host):
             return False
         self.hosts.add(ident_host)
+        self._hosts_lower.add(ident_host.lower())
         return True
 
 
@@ -107,6 +117,9 @@ class IRCClient:
         self._signals_registered = False
         self._last_connect_time: Optional[float] = None
         self._last_disconnect_time: Optional[float] = None
+        self._pending_config_updates: Dict[str, Callable[[Dict[str, Any]], bool]] = {}
+        self._config_flush_handle: Optional[asyncio.TimerHandle] = None
+        self._config_write_future: Optional[asyncio.Future] = None
 
     async def start(self) -> None:
         """Attempt to connect and stay connected with exponential backoff."""
@@ -129,6 +142,7 @@ class IRCClient:
     async def stop(self) -> None:
         self._stop_event.set()
         await self._cleanup_connection()
+        await self._drain_config_updates()
 
     async def _connect_once(self) -> None:
         ssl_context = ssl.create_default_context() if self.use_tls else None
@@ -593,36 +607,22 @@ class IRCClient:
         # Snapshot for the background write
         channels_snapshot = list(normalized_channels)
 
-        def _write() -> None:
-            lock_path = config_path.with_suffix(config_path.suffix + ".lock")
-            with file_lock(lock_path):
-                data = load_yaml_file(config_path)
-
-                existing_section = data.get("channels")
-                if isinstance(existing_section, list):
-                    existing_channels = [
-                        str(item).strip() for item in existing_section if isinstance(item, str)
-                    ]
-                else:
-                    existing_channels = []
-
-                if existing_channels == channels_snapshot:
-                    return
+        def _update(data: Dict[str, Any]) -> bool:
+            existing_section = data.get("channels")
+            if isinstance(existing_section, list):
+                existing_channels = [
+                    str(item).strip() for item in existing_section if isinstance(item, str)
+                ]
+            else:
+                existing_channels = []
 
-                data["channels"] = channels_snapshot
+            if existing_channels == channels_snapshot:
+                return False
 
-                try:
-                    atomic_write_yaml(config_path, data)
-                except Exception:
-                    self.logger.warning(
-                        "Failed to write updated channels to config", exc_info=True
-                    )
+            data["channels"] = channels_snapshot
+            return True
 
-        try:
-            loop = asyncio.get_running_loop()
-            loop.run_in_executor(None, _write)
-        except RuntimeError:
-            _write()
+        self._queue_config_update("channels", _update)
 
     def _load_owner_records(self, config: Dict[str, Any]) -> Dict[str, OwnerRecord]:
         raw_entries = config.get("owner_nicks", []) or []
@@ -701,24 +701,90 @@ class IRCClient:
         # Snapshot for the background write
         serialized_snapshot = list(serialized)
 
-        def _write() -> None:
-            lock_path = config_path.with_suffix(config_path.suffix + ".lock")
-            with file_lock(lock_path):
-                data = load_yaml_file(config_path)
-                data["owner_nicks"] = serialized_snapshot
+        def _update(data: Dict[str, Any]) -> bool:
+            data["owner_nicks"] = serialized_snapshot
+            return True
 
-                try:
-                    atomic_write_yaml(config_path, data)
-                except Exception:
-                    self.logger.warning(
-                        "Failed to write updated owner records to config", exc_info=True
-                    )
+        self._queue_config_update("owner_nicks", _update)
+
+    def _queue_config_update(self, section: str, update: Callable[[Dict[str, Any]], bool]) -> None:
+        """Queue ``update`` for the next coalesced write of config.yaml.
+
+        A newer update for the same section replaces the queued one, so a burst
+        of joins or owner changes costs a single read-modify-write.
+        """
+        self._pending_config_updates[section] = update
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_config_updates()
+            return
+        if self._config_flush_handle is None:
+            self._config_flush_handle = loop.call_later(
+                CONFIG_WRITE_DELAY_SECS, self._flush_config_updates
+            )
+
+    def _flush_config_updates(self) -> None:
+        self._config_flush_handle = None
+        config_path = self.plugin_manager.get_config_path()
+        if not config_path or not self._pending_config_updates:
+            self._pending_config_updates.clear()
+            return
 
         try:
             loop = asyncio.get_running_loop()
-            loop.run_in_executor(None, _write)
         except RuntimeError:
-            _write()
+            loop = None
+
+        if loop is None:
+            updates = list(self._pending_config_updates.values())
+            self._pending_config_updates.clear()
+            self._write_config_updates(config_path, updates)
+            return
+
+        if self._config_write_future is not None and not self._config_write_future.done():
+            # Keep writes ordered: retry once the in-flight write has landed.
+            self._config_flush_handle = loop.call_later(
+                CONFIG_WRITE_DELAY_SECS, self._flush_config_updates
+            )
+            return
+
+        updates = list(self._pending_config_updates.values())
+        self._pending_config_updates.clear()
+        self._config_write_future = loop.run_in_executor(
+            None, self._write_config_updates, config_path, updates
+        )
+
+    def _write_config_updates(
+        self, config_path, updates: List[Callable[[Dict[str, Any]], bool]]
+    ) -> None:
+        lock_path = config_path.with_suffix(config_path.suffix + ".lock")
+        with file_lock(lock_path):
+            data = load_yaml_file(config_path)
+            changed = False
+            for update in updates:
+                if update(data):
+                    changed = True
+            if not changed:
+                return
+            try:
+                atomic_write_yaml(config_path, data)
+            except Exception:
+                self.logger.warning("Failed to write updated config", exc_info=True)
+
+    async def _drain_config_updates(self) -> None:
+        """Write any queued config updates now; called on shutdown."""
+        if self._config_flush_handle is not None:
+            self._config_flush_handle.cancel()
+            self._config_flush_handle = None
+        if self._config_write_future is not None:
+            with contextlib.suppress(Exception):
+                await self._config_write_future
+        if self._pending_config_updates:
+            self._flush_config_updates()
+            if self._config_write_future is not None:
+                with contextlib.suppress(Exception):
+                    await self._config_write_future
 
     def _extract_owner_identity(self, prefix: str) -> tuple[Optional[str], Optional[str]]:
         if "!" not in prefix:
@@ -767,7 +833,7 @@ class IRCClient:
             return False
 
         has_access = record.has_host(ident_host)
-        if not has_access:
+        if not has_access and self.logger.isEnabledFor(logging.DEBUG):
             self.logger.debug(
                 "Owner access check failed: ident_host %s not in hosts %s for nick %s",
                 ident_host,
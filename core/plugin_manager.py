@@ -5,14 +5,18 @@ import importlib.util
 import inspect
 import logging
 import sys
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 from types import ModuleType
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
 
 import yaml
 
+from .utils import atomic_write_yaml, load_yaml_section
+
 HANDLER_TIMEOUT_SECS = 10
+PLUGIN_EVENTS = ("on_message", "on_join", "on_part", "on_nick", "on_kick", "on_quit")
 
 
 @dataclass
@@ -36,6 +40,10 @@ class PluginManager:
         self.plugin_dir = plugin_dir
         self.logger = logger or logging.getLogger("PluginManager")
         self._plugins: Dict[str, ModuleType] = {}
+        # Event name -> [(plugin, handler)], rebuilt whenever a plugin loads or unloads.
+        self._event_handlers: Dict[str, List[Tuple[str, Callable]]] = {
+            event: [] for event in PLUGIN_EVENTS
+        }
         self._disabled_plugins: Set[str] = set()
         self._known_plugins: Set[str] = set()
         self._config_path = config_path
@@ -104,6 +112,7 @@ class PluginManager:
             raise
         else:
             self._plugins[plugin_name] = module
+            self._rebuild_event_handlers()
             self._known_plugins.add(plugin_name)
             if plugin_name in self._disabled_plugins:
                 self._disabled_plugins.discard(plugin_name)
@@ -116,6 +125,7 @@ class PluginManager:
         if module is None:
             raise RuntimeError(f"Plugin '{plugin_name}' is not loaded")
 
+        self._rebuild_event_handlers()
         self._unregister_commands_for_plugin(plugin_name)
         on_unload = getattr(module, "on_unload", None)
         if callable(on_unload):
@@ -143,74 +153,40 @@ class PluginManager:
         self.unload(plugin_name, bot, _persist=False)
         self.load(plugin_name, bot, _persist=False)
 
-    def dispatch_message(self, bot, user: str, channel: str, message: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_message", None)
-            if not callable(handler):
-                self.logger.warning(
-                    "Plugin '%s' lacks on_message handler; skipping dispatch", name
-                )
-                continue
+    def _rebuild_event_handlers(self) -> None:
+        handlers: Dict[str, List[Tuple[str, Callable]]] = {event: [] for event in PLUGIN_EVENTS}
+        for name, module in self._plugins.items():
+            for event, bucket in handlers.items():
+                handler = getattr(module, event, None)
+                if callable(handler):
+                    bucket.append((name, handler))
+        self._event_handlers = handlers
+
+    def _dispatch(self, event: str, *args) -> None:
+        for name, handler in self._event_handlers[event]:
             self._spawn_task(
                 name,
-                self._run_handler(handler, name, "on_message", bot, user, channel, message),
-                f"plugin-{name}-on_message",
+                self._run_handler(handler, name, event, *args),
+                f"plugin-{name}-{event}",
             )
 
+    def dispatch_message(self, bot, user: str, channel: str, message: str) -> None:
+        self._dispatch("on_message", bot, user, channel, message)
+
     def dispatch_join(self, bot, user: str, channel: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_join", None)
-            if not callable(handler):
-                continue
-            self._spawn_task(
-                name,
-                self._run_handler(handler, name, "on_join", bot, user, channel),
-                f"plugin-{name}-on_join",
-            )
+        self._dispatch("on_join", bot, user, channel)
 
     def dispatch_part(self, bot, user: str, channel: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_part", None)
-            if not callable(handler):
-                continue
-            self._spawn_task(
-                name,
-                self._run_handler(handler, name, "on_part", bot, user, channel),
-                f"plugin-{name}-on_part",
-            )
+        self._dispatch("on_part", bot, user, channel)
 
     def dispatch_nick(self, bot, user: str, new_nick: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_nick", None)
-            if not callable(handler):
-                continue
-            self._spawn_task(
-                name,
-                self._run_handler(handler, name, "on_nick", bot, user, new_nick),
-                f"plugin-{name}-on_nick",
-            )
+        self._dispatch("on_nick", bot, user, new_nick)
 
     def dispatch_kick(self, bot, channel: str, target: str, kicker: str, reason: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_kick", None)
-            if not callable(handler):
-                continue
-            self._spawn_task(
-                name,
-                self._run_handler(handler, name, "on_kick", bot, channel, target, kicker, reason),
-                f"plugin-{name}-on_kick",
-            )
+        self._dispatch("on_kick", bot, channel, target, kicker, reason)
 
     def dispatch_quit(self, bot, user: str, reason: str) -> None:
-        for name, module in list(self._plugins.items()):
-            handler = getattr(module, "on_quit", None)
-            if not callable(handler):
-                continue
-            self._spawn_task(
-                name,
-                self._run_handler(handler, name, "on_quit", bot, user, reason),
-                f"plugin-{name}-on_quit",
-            )
+        self._dispatch("on_quit", bot, user, reason)
 
     def register_command(
         self,
@@ -306,13 +282,11 @@ class PluginManager:
         if not self._config_path or not self._config_path.exists():
             return
         try:
-            with self._config_path.open("r", encoding="utf-8") as handle:
-                data = yaml.safe_load(handle) or {}
+            plugins_section = load_yaml_section(self._config_path, "plugins")
         except Exception:
             self.logger.warning("Failed to read config for plugin preferences", exc_info=True)
             return
 
-        plugins_section = data.get("plugins")
         if not isinstance(plugins_section, dict):
             return
 
@@ -342,30 +316,39 @@ class PluginManager:
 
     def _merge_defaults(self, target: Dict, defaults: Dict) -> bool:
         changed = False
-        for key, value in defaults.items():
-            if isinstance(value, dict):
-                existing = target.get(key)
-                if not isinstance(existing, dict):
-                    if key in target:
-                        # Existing non-dict; skip to avoid corruption.
+        # Walk with an explicit stack; a defaults dict shared under several
+        # keys is only merged once into any given target.
+        pending: Deque[Tuple[Dict, Dict]] = deque([(target, defaults)])
+        visited: Set[Tuple[int, int]] = set()
+        while pending:
+            target, defaults = pending.pop()
+            pair = (id(target), id(defaults))
+            if pair in visited:
+                continue
+            visited.add(pair)
+            for key, value in defaults.items():
+                if isinstance(value, dict):
+                    existing = target.get(key)
+                    if not isinstance(existing, dict):
+                        if key in target:
+                            # Existing non-dict; skip to avoid corruption.
+                            continue
+                        target[key] = {}
+                        existing = target[key]
+                        changed = True
+                    pending.append((existing, value))
+                elif isinstance(value, list):
+                    existing = target.setdefault(key, [])
+                    if not isinstance(existing, list):
                         continue
-                    target[key] = {}
-                    existing = target[key]
-                    changed = True
-                if self._merge_defaults(existing, value):
-                    changed = True
-            elif isinstance(value, list):
-                existing = target.setdefault(key, [])
-                if not isinstance(existing, list):
-                    continue
-                for item in value:
-                    if item not in existing:
-                        existing.append(item)
+                    for item in value:
+                        if item not in existing:
+                            existing.append(item)
+                            changed = True
+                else:
+                    if key not in target:
+                        target[key] = value
                         changed = True
-            else:
-                if key not in target:
-                    target[key] = value
-                    changed = True
         return changed
 
     def _set_plugin_enabled_flag(self, bot, plugin_name: str, enabled: bool) -> None:
@@ -421,20 +404,13 @@ class PluginManager:
             entry["enabled"] = desired
 
         try:
-            self._config_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._config_path.open("w", encoding="utf-8") as handle:
-                yaml.safe_dump(data, handle, sort_keys=False)
+            atomic_write_yaml(self._config_path, data)
         except Exception:
             self.logger.warning("Failed to write plugin enabled flag for '%s'", plugin_name, exc_info=True)
 
     def _reapply_all_defaults(self, bot) -> None:
-        bot_config = getattr(bot, "config", None)
-        if not isinstance(bot_config, dict):
-            return
         for name, module in self._plugins.items():
-            defaults = getattr(module, "CONFIG_DEFAULTS", None)
-            if isinstance(defaults, dict) and defaults:
-                self._merge_defaults(bot_config, defaults)
+            self._apply_config_defaults(bot, name, module)
 
     def _refresh_bot_config(self, bot) -> None:
         if not self._config_path or not self._config_path.exists():
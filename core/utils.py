@@ -3,16 +3,27 @@ import contextlib
 import functools
 import logging
 import os
+import threading
 import time
 from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 
-from filelock import FileLock
+from filelock import AsyncFileLock, FileLock
 
 import yaml
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 
 def setup_logging(level: int = logging.INFO) -> None:
     """Configure the root logger with timestamped output."""
@@ -106,23 +117,38 @@ class AsyncRateLimiter:
         return time.monotonic() - self._events[-1] > self.per_seconds
 
 
+@functools.lru_cache(maxsize=32)
+def _compile_validator(checks: Tuple[Tuple[str, type], ...]) -> Callable[[Dict[str, object]], None]:
+    def validate(config: Dict[str, object]) -> None:
+        try:
+            if all(isinstance(config[key], expected) for key, expected in checks):
+                return
+        except KeyError:
+            pass
+
+        # Slow path only to build an accurate error message.
+        missing = [key for key, _ in checks if key not in config]
+        if missing:
+            raise KeyError(f"Missing required config keys: {', '.join(missing)}")
+        for key, expected_type in checks:
+            if not isinstance(config[key], expected_type):
+                raise TypeError(f"Config key '{key}' must be of type {expected_type.__name__}")
+
+    return validate
+
+
+def build_validator(required: Dict[str, type]) -> Callable[[Dict[str, object]], None]:
+    """Return a cached checker for ``required``; see :func:`validate_required_keys`."""
+    return _compile_validator(tuple(required.items()))
+
+
 def validate_required_keys(config: Dict[str, object], required: Dict[str, type]) -> None:
     """Ensure required keys exist and match expected types."""
-    missing = [key for key in required if key not in config]
-    if missing:
-        raise KeyError(f"Missing required config keys: {', '.join(missing)}")
-
-    for key, expected_type in required.items():
-        if not isinstance(config[key], expected_type):
-            raise TypeError(f"Config key '{key}' must be of type {expected_type.__name__}")
+    build_validator(required)(config)
 
 
-def validate_config(config: Dict[str, Any]) -> None:
-    """
-    Validate the configuration schema.
-    Raises ValueError or TypeError if the configuration is invalid.
-    """
-    required_keys = {
+_validate_core_keys = build_validator(
+    {
         "server": str,
         "port": int,
         "nickname": str,
@@ -130,7 +156,15 @@ def validate_config(config: Dict[str, Any]) -> None:
         "realname": str,
         "channels": list,
     }
-    validate_required_keys(config, required_keys)
+)
+
+
+def validate_config(config: Dict[str, Any]) -> None:
+    """
+    Validate the configuration schema.
+    Raises ValueError or TypeError if the configuration is invalid.
+    """
+    _validate_core_keys(config)
 
     # Optional keys validation
     if "use_tls" in config and not isinstance(config["use_tls"], bool):
@@ -152,7 +186,7 @@ def load_yaml_file(path: Path) -> Dict[str, Any]:
         return {}
     try:
         with path.open("r", encoding="utf-8") as handle:
-            data = yaml.safe_load(handle) or {}
+            data = yaml.load(handle, Loader=_YamlLoader) or {}
         if isinstance(data, dict):
             return data
     except Exception:
@@ -160,9 +194,29 @@ def load_yaml_file(path: Path) -> Dict[str, Any]:
     return {}
 
 
+def load_yaml_section(path: Path, key: str) -> Any:
+    """Return only the top-level ``key`` of the YAML file at ``path``.
+
+    The document is composed into nodes, but only the requested subtree is
+    constructed into Python objects. Returns ``None`` if the key is absent.
+    """
+    with path.open("r", encoding="utf-8") as handle:
+        root = yaml.compose(handle, Loader=_YamlLoader)
+    if not isinstance(root, yaml.MappingNode):
+        return None
+    for key_node, value_node in root.value:
+        if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+            return yaml.constructor.SafeConstructor().construct_document(value_node)
+    return None
+
+
 @contextlib.contextmanager
 def file_lock(lock_path: Path):
-    """Cross-platform file locking using filelock."""
+    """Cross-platform file locking using filelock.
+
+    Acquisition blocks the calling thread; from a coroutine use
+    :func:`async_file_lock` instead so a contended lock cannot stall the loop.
+    """
     # Ensure directory exists
     lock_path.parent.mkdir(parents=True, exist_ok=True)
     lock = FileLock(str(lock_path))
@@ -170,6 +224,14 @@ def file_lock(lock_path: Path):
         yield
 
 
+@contextlib.asynccontextmanager
+async def async_file_lock(lock_path: Path):
+    """Async counterpart of :func:`file_lock`; waits for the lock in the executor."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    async with AsyncFileLock(str(lock_path)):
+        yield
+
+
 def get_plugin_config(bot, plugin_name: str) -> dict:
     """Return the config dict for a plugin, or empty dict if missing."""
     config = getattr(bot, "config", {})
@@ -191,41 +253,154 @@ async def run_blocking(func, *args, **kwargs):
     return await loop.run_in_executor(None, call)
 
 
-async def async_http_get(url: str, *, params=None, timeout: int = 10, **kwargs):
-    """Run requests.get in an executor to avoid blocking the event loop."""
-    import requests
+HTTP_POOL_CONNECTIONS = 16
+HTTP_POOL_MAXSIZE = 32
+HTTP_RETRY_TOTAL = 2
+HTTP_RETRY_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_JITTER_SECS = 0.2
+HTTP_RETRY_AFTER_CAP_SECS = 5.0
+HTTP_RETRY_STATUS_CODES = (429, 502, 503, 504)
+HTTP_RETRY_ALLOWED_METHODS = frozenset({"GET", "HEAD", "POST"})
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _build_retry():
+    from urllib3.util.retry import Retry
+
+    class _CappedRetry(Retry):
+        # Plugin handlers have a short budget; never sleep longer than the cap
+        # even if the server asks for more.
+        def get_retry_after(self, response):
+            retry_after = super().get_retry_after(response)
+            if retry_after is None:
+                return None
+            return min(retry_after, HTTP_RETRY_AFTER_CAP_SECS)
+
+    return _CappedRetry(
+        total=HTTP_RETRY_TOTAL,
+        backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+        backoff_jitter=HTTP_RETRY_JITTER_SECS,
+        status_forcelist=HTTP_RETRY_STATUS_CODES,
+        allowed_methods=HTTP_RETRY_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def get_http_session():
+    """Return the process-wide ``requests.Session`` used by the HTTP helpers.
+
+    The session keeps connections alive per host, so repeated calls to the
+    same API (e.g. Avanza search + chart) skip the TCP/TLS handshake, and
+    retries 429/502/503/504 with backoff, honouring a capped Retry-After.
+    """
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
 
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=_build_retry(),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def close_http_session() -> None:
+    """Close the shared HTTP session; a later helper call opens a new one."""
+    global _http_session
+    with _http_session_lock:
+        session, _http_session = _http_session, None
+    if session is not None:
+        session.close()
+
+
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def host_semaphore(host: str, limit: int) -> asyncio.Semaphore:
+    """Return the shared semaphore capping concurrent requests to ``host``.
+
+    The first caller for a host fixes its limit.
+    """
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = _host_semaphores[host] = asyncio.Semaphore(max(1, limit))
+    return semaphore
+
+
+async def async_http_get(url: str, *, params=None, timeout: int = 10, **kwargs):
+    """Run a GET on the shared session in an executor to avoid blocking the event loop."""
     loop = asyncio.get_running_loop()
-    call = functools.partial(requests.get, url, params=params, timeout=timeout, **kwargs)
+    call = functools.partial(
+        get_http_session().get, url, params=params, timeout=timeout, **kwargs
+    )
     return await loop.run_in_executor(None, call)
 
 
 async def async_http_post(url: str, *, data=None, json=None, timeout: int = 10, **kwargs):
-    """Run requests.post in an executor to avoid blocking the event loop."""
-    import requests
+    """Run a POST on the shared session in an executor to avoid blocking the event loop.
 
+    POSTs are retried like GETs, so only use this for idempotent requests.
+    """
     loop = asyncio.get_running_loop()
-    call = functools.partial(requests.post, url, data=data, json=json, timeout=timeout, **kwargs)
+    call = functools.partial(
+        get_http_session().post, url, data=data, json=json, timeout=timeout, **kwargs
+    )
     return await loop.run_in_executor(None, call)
 
 
 def atomic_write_yaml(path: Path, data: Dict[str, Any]) -> None:
+    """Write YAML to ``path`` atomically using the libyaml emitter when available.
+
+    The temp file is fsynced before ``os.replace`` so a crash cannot leave a
+    truncated config behind.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp_path = path.with_suffix(path.suffix + ".tmp")
     with tmp_path.open("w", encoding="utf-8") as handle:
-        yaml.safe_dump(data, handle, sort_keys=False)
+        yaml.dump(data, handle, Dumper=_YamlDumper, sort_keys=False, default_flow_style=False)
+        handle.flush()
+        os.fsync(handle.fileno())
     os.replace(tmp_path, path)
 
 
-def load_json(path: Path, default: Any = None) -> Any:
-    """Load JSON from ``path``, returning ``default`` if missing or unreadable."""
+def json_loads(data: Any) -> Any:
+    """Parse JSON from ``str`` or ``bytes``, using orjson when installed.
+
+    Both backends raise a ``ValueError`` subclass on malformed input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
     import json
 
+    return json.loads(data)
+
+
+def json_dumps(data: Any) -> bytes:
+    """Encode ``data`` as compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    import json
+
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Load JSON from ``path``, returning ``default`` if missing or unreadable."""
     if not path.exists():
         return default
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+        return json_loads(path.read_bytes())
     except Exception:
         return default
 
@@ -234,14 +409,38 @@ def atomic_write_json(path: Path, data: Any, **dump_kwargs: Any) -> None:
     """Write JSON to ``path`` atomically (temp file + os.replace).
 
     A crash mid-write leaves the original file intact instead of a
-    truncated/corrupt one. Extra kwargs are forwarded to ``json.dump``.
+    truncated/corrupt one. Extra kwargs are forwarded to ``json.dumps``;
+    when they are limited to ``indent=2`` and ``sort_keys``, orjson is used
+    instead if installed.
     """
-    import json
-
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as handle:
-        json.dump(data, handle, **dump_kwargs)
+    encoded = _orjson_dumps(data, dump_kwargs)
+    if encoded is None:
+        import json
+
+        # Encode up front: json.dump issues one write() per token.
+        encoded = json.dumps(data, **dump_kwargs).encode("utf-8")
+    with tmp_path.open("wb") as handle:
+        handle.write(encoded)
         handle.flush()
         os.fsync(handle.fileno())
     os.replace(tmp_path, path)
+
+
+def _orjson_dumps(data: Any, dump_kwargs: Dict[str, Any]) -> Optional[bytes]:
+    """Encode with orjson when it can honour ``dump_kwargs``; ``None`` otherwise."""
+    if orjson is None or not set(dump_kwargs) <= {"indent", "sort_keys"}:
+        return None
+    indent = dump_kwargs.get("indent")
+    if indent not in (None, 2):
+        return None
+    option = orjson.OPT_NON_STR_KEYS
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+    if dump_kwargs.get("sort_keys"):
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        return orjson.dumps(data, option=option)
+    except TypeError:
+        return None
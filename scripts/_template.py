@@ -17,8 +17,13 @@ CONFIG_DEFAULTS = {
     }
 }
 
+# Normalized triggers, computed once per load instead of on every message.
+_TRIGGERS = None
+
 
 def on_load(bot):
+    global _TRIGGERS
+    _TRIGGERS = None
     triggers = _triggers(bot)
     prefix = getattr(bot, "prefix", ".")
     names = ", ".join(f"{prefix}{trigger}" for trigger in triggers) or "no trigger"
@@ -26,6 +31,8 @@ def on_load(bot):
 
 
 def on_unload(bot):
+    global _TRIGGERS
+    _TRIGGERS = None
     logger.info("example plugin unloaded")
 
 
@@ -44,8 +51,21 @@ def on_message(bot, user, channel, message):
 
 
 def _triggers(bot):
-    default_triggers = CONFIG_DEFAULTS["plugins"]["example"]["triggers"]
-    return list(default_triggers)
-
-
- 
+    global _TRIGGERS
+    if _TRIGGERS is None:
+        try:
+            raw = bot.config["plugins"]["example"]["triggers"]
+        except (AttributeError, KeyError, TypeError):
+            raw = CONFIG_DEFAULTS["plugins"]["example"]["triggers"]
+        _TRIGGERS = _normalize_triggers(raw)
+    return _TRIGGERS
+
+
+def _normalize_triggers(raw):
+    # A dict keeps first-seen order while deduplicating in O(n).
+    seen = {}
+    for item in raw or ():
+        text = str(item).strip().lower()
+        if text:
+            seen[text] = None
+    return list(seen)
@@ -1,9 +1,12 @@
-"""Avanza stock lookup (trigger: `.avanza`)."""
+"""Avanza stock lookup (command: `.avanza`)."""
 
 import asyncio
 import logging
+import re
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 
@@ -12,6 +15,12 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://www.avanza.se"
 SEARCH_ENDPOINT = f"{BASE_URL}/_api/search/filtered-search"
 PRICE_ENDPOINT = f"{BASE_URL}/_api/price-chart/stock/{{orderbook_id}}"
+AVANZA_HOST = "www.avanza.se"
+AVANZA_MAX_CONCURRENT = 4
+_DIGIT_RUN = re.compile(r"\d+")
+RESULT_CACHE_TTL_SECS = 60.0
+RESULT_CACHE_MAX_ENTRIES = 256
+ORDERBOOK_CACHE_MAX_ENTRIES = 1024
 
 
 CONFIG_DEFAULTS = {
@@ -24,6 +33,10 @@ CONFIG_DEFAULTS = {
 }
 
 
+class _NoQuote(Exception):
+    """A lookup that found no price; the message is sent as the reply and never cached."""
+
+
 @dataclass
 class AvanzaSettings:
     triggers: Tuple[str, ...] = tuple(CONFIG_DEFAULTS["plugins"]["avanza"]["triggers"])
@@ -31,10 +44,26 @@ class AvanzaSettings:
 
 settings = AvanzaSettings()
 
+# Lookups keyed by normalized query: running ones are shared by every caller,
+# finished ones are served from an LRU of (time.monotonic(), reply).
+_inflight: Dict[str, "asyncio.Task[str]"] = {}
+_result_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+# Order book ids never change for a listing, so query -> (id, search hit) is
+# kept without a TTL and only bounded in size.
+_obid_cache: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+
 
 def on_load(bot) -> None:
     global settings
     settings = _settings_from_config(bot)
+    command, *aliases = settings.triggers
+    bot.plugin_manager.register_command(
+        "avanza",
+        command,
+        _handle_avanza_command,
+        aliases=aliases,
+        help_text="Look up a stock price on Avanza. Usage: .avanza <stock name>",
+    )
     prefix = getattr(bot, "prefix", ".")
     trigger_text = ", ".join(f"{prefix}{trigger}" for trigger in settings.triggers)
     logger.info("avanza plugin loaded from %s; responding to %s", __file__, trigger_text)
@@ -43,26 +72,16 @@ def on_load(bot) -> None:
 def on_unload(bot) -> None:
     global settings
     settings = AvanzaSettings()
+    for task in _inflight.values():
+        task.cancel()
+    _inflight.clear()
+    _result_cache.clear()
+    _obid_cache.clear()
     logger.info("avanza plugin unloaded")
 
 
-def on_message(bot, user: str, channel: str, message: str) -> None:
-    prefix = getattr(bot, "prefix", ".")
-    if not message.startswith(prefix):
-        return
-
-    command_line = message[len(prefix) :].strip()
-    if not command_line:
-        return
-
-    parts = command_line.split(maxsplit=1)
-    command = parts[0].lower()
-    if command not in settings.triggers:
-        return
-
-    query = parts[1].strip() if len(parts) > 1 else ""
-    loop = asyncio.get_running_loop()
-    loop.create_task(_handle_avanza(bot, channel, query), name="avanza-command")
+async def _handle_avanza_command(bot, user: str, channel: str, args: List[str], is_private: bool) -> None:
+    await _handle_avanza(bot, channel, " ".join(args).strip())
 
 
 async def _handle_avanza(bot, channel: str, query: str) -> None:
@@ -72,6 +91,9 @@ async def _handle_avanza(bot, channel: str, query: str) -> None:
 
     try:
         response = await _fetch_quote_text(query, bot.request_timeout)
+    except _NoQuote as exc:
+        await bot.privmsg(channel, str(exc))
+        return
     except requests.RequestException:
         logger.warning("Avanza request failed for query %s", query, exc_info=True)
         await bot.privmsg(channel, "Avanza request failed; try again later.")
@@ -85,22 +107,57 @@ async def _handle_avanza(bot, channel: str, query: str) -> None:
 
 
 async def _fetch_quote_text(query: str, timeout: int) -> str:
-    from core.utils import run_blocking
-    return await run_blocking(_fetch_quote_text_sync, query, timeout)
-
-
-def _fetch_quote_text_sync(query: str, timeout: int) -> str:
-    ob_id, hit = _search_stock_sync(query, timeout)
-    if not ob_id:
-        return "No order book id found; cannot fetch chart."
+    key = query.strip().lower()
+    cached = _result_cache.get(key)
+    if cached is not None:
+        stamp, text = cached
+        if time.monotonic() - stamp < RESULT_CACHE_TTL_SECS:
+            _result_cache.move_to_end(key)
+            return text
+        del _result_cache[key]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(
+            _lookup_quote_text(query, timeout), name="avanza-lookup"
+        )
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _finish_lookup(key, done))
+    # Shield so one caller timing out does not cancel the lookup for the rest.
+    return await asyncio.shield(task)
+
+
+def _finish_lookup(key: str, task: "asyncio.Task[str]") -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if task.cancelled() or task.exception() is not None:
+        return
+    _result_cache[key] = (time.monotonic(), task.result())
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > RESULT_CACHE_MAX_ENTRIES:
+        _result_cache.popitem(last=False)
+
+
+async def _lookup_quote_text(query: str, timeout: int) -> str:
+    key = query.strip().lower()
+    cached = _obid_cache.get(key)
+    if cached is not None:
+        _obid_cache.move_to_end(key)
+        ob_id, hit = cached
+    else:
+        ob_id, hit = await _search_stock(query, timeout)
+        if not ob_id:
+            raise _NoQuote("No order book id found; cannot fetch chart.")
+        _obid_cache[key] = (ob_id, hit)
+        while len(_obid_cache) > ORDERBOOK_CACHE_MAX_ENTRIES:
+            _obid_cache.popitem(last=False)
 
     try:
-        payload = _fetch_chart_data_sync(ob_id, timeout)
+        latest = await _fetch_latest_close(ob_id, timeout)
     except ValueError:
-        return "Non-JSON response"
-    latest = latest_close_from_chart(payload)
+        raise _NoQuote("Non-JSON response")
     if latest is None:
-        return "No OHLC data found."
+        raise _NoQuote("No OHLC data found.")
 
     title = hit.get("title") or f"Order book {ob_id}"
     url = f"{BASE_URL}/aktier/om-aktien.html/{ob_id}"
@@ -118,33 +175,72 @@ def latest_close_from_chart(payload: Dict[str, Any]) -> Optional[float]:
         return None
 
 
-def _fetch_chart_data_sync(orderbook_id: int, timeout: int) -> Dict[str, Any]:
-    params = {"timePeriod": "today"}
-    response = requests.get(
-        PRICE_ENDPOINT.format(orderbook_id=orderbook_id),
-        params=params,
-        timeout=timeout,
-    )
+def _tail_close(body: bytes) -> Optional[float]:
+    """Read the last OHLC close straight from the raw chart JSON.
+
+    Returns None unless the match is clearly inside the last entry of the
+    flat ``ohlc`` array, so callers can fall back to a full parse.
+    """
+    ohlc_at = body.rfind(b'"ohlc"')
+    close_at = body.rfind(b'"close":')
+    if ohlc_at == -1 or close_at < ohlc_at:
+        return None
+    array_end = body.find(b"]", close_at)
+    if array_end == -1 or b"]" in body[ohlc_at:close_at]:
+        return None
+    if body.count(b"}", close_at, array_end) != 1:
+        return None
+    start = close_at + len(b'"close":')
+    end = start
+    while end < array_end and body[end] not in b",}":
+        end += 1
+    try:
+        return float(body[start:end])
+    except ValueError:
+        return None
+
+
+async def _fetch_latest_close(orderbook_id: int, timeout: int) -> Optional[float]:
+    from core.utils import async_http_get, host_semaphore, json_loads
+
+    async with host_semaphore(AVANZA_HOST, AVANZA_MAX_CONCURRENT):
+        response = await async_http_get(
+            PRICE_ENDPOINT.format(orderbook_id=orderbook_id),
+            params={"timePeriod": "today"},
+            timeout=timeout,
+        )
     response.raise_for_status()
+    body = response.content
+    latest = _tail_close(body)
+    if latest is not None:
+        return latest
     try:
-        return response.json()
+        payload = json_loads(body)
     except ValueError:
         raise ValueError("Non-JSON response from Avanza chart API")
+    return latest_close_from_chart(payload)
 
 
-def _search_stock_sync(query: str, timeout: int) -> Tuple[Optional[int], Dict[str, Any]]:
+async def _search_stock(query: str, timeout: int) -> Tuple[Optional[int], Dict[str, Any]]:
+    from core.utils import async_http_post, host_semaphore, json_loads
+
     options = {
         "query": query,
         "searchFilter": {"types": ["STOCK"]},
         "pagination": {"from": 0, "size": 10},
     }
-    response = requests.post(SEARCH_ENDPOINT, json=options, timeout=timeout)
+    async with host_semaphore(AVANZA_HOST, AVANZA_MAX_CONCURRENT):
+        response = await async_http_post(SEARCH_ENDPOINT, json=options, timeout=timeout)
     response.raise_for_status()
     try:
-        data = response.json()
+        data = json_loads(response.content)
     except ValueError:
         return None, {}
 
+    return _orderbook_from_search(data)
+
+
+def _orderbook_from_search(data: Dict[str, Any]) -> Tuple[Optional[int], Dict[str, Any]]:
     hits = data.get("hits") or []
     if not hits:
         return None, data
@@ -159,7 +255,7 @@ def _search_stock_sync(query: str, timeout: int) -> Tuple[Optional[int], Dict[st
                 continue
 
     path = first.get("path") or ""
-    digits = "".join(ch if ch.isdigit() else " " for ch in path).split()
+    digits = _DIGIT_RUN.findall(path)
     if digits:
         try:
             return int(digits[-1]), first
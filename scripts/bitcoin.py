@@ -1,12 +1,15 @@
-"""BTC price responder using CoinGecko (triggers: `.bitcoin`, `.b`)."""
+"""BTC price responder using CoinGecko (commands: `.bitcoin`, `.b`)."""
 
 import asyncio
 import logging
+import time
 from dataclasses import dataclass
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 API_URL = "https://api.coingecko.com/api/v3/simple/price"
 API_PARAMS = {"ids": "bitcoin", "vs_currencies": "usd"}
+API_HOST = "api.coingecko.com"
+API_MAX_CONCURRENT = 2
 logger = logging.getLogger(__name__)
 
 CONFIG_DEFAULTS = {
@@ -14,6 +17,7 @@ CONFIG_DEFAULTS = {
         "bitcoin": {
             "enabled": True,
             "triggers": ["bitcoin", "b"],
+            "cache_ttl_secs": 30,
         }
     }
 }
@@ -23,43 +27,48 @@ class BitcoinSettings:
     triggers: Tuple[str, ...] = tuple(
         CONFIG_DEFAULTS["plugins"]["bitcoin"]["triggers"]
     )
+    cache_ttl_secs: float = 30.0
 
 
 settings: BitcoinSettings = BitcoinSettings()
 
+# Last fetched price and its time.monotonic() stamp.
+_cache_price: Optional[int] = None
+_cache_ts = 0.0
+_cache_lock: Optional[asyncio.Lock] = None
+
 
 def on_load(bot) -> None:
     global settings
     settings = _settings_from_config(bot)
+    command, *aliases = settings.triggers
+    bot.plugin_manager.register_command(
+        "bitcoin",
+        command,
+        _handle_bitcoin_registered,
+        aliases=aliases,
+        help_text="Show the current BTC price in USD.",
+    )
     trigger_text = ", ".join(f"{bot.prefix}{trigger}" for trigger in settings.triggers)
     logger.info("bitcoin plugin loaded from %s; responding to %s", __file__, trigger_text)
 
 
 def on_unload(bot) -> None:
-    global settings
+    global settings, _cache_price, _cache_ts, _cache_lock
     settings = BitcoinSettings()
+    _cache_price = None
+    _cache_ts = 0.0
+    _cache_lock = None
     logger.info("bitcoin plugin unloaded")
 
 
-def on_message(bot, user: str, channel: str, message: str) -> None:
-    prefix = bot.prefix
-    if not message.startswith(prefix):
-        return
-
-    command = message[len(prefix) :].strip().split()
-    if not command:
-        return
-
-    if command[0].lower() not in settings.triggers:
-        return
-
-    loop = asyncio.get_running_loop()
-    loop.create_task(_handle_bitcoin_command(bot, channel))
+async def _handle_bitcoin_registered(bot, user: str, channel: str, args: List[str], is_private: bool) -> None:
+    await _handle_bitcoin_command(bot, channel)
 
 
 async def _handle_bitcoin_command(bot, channel: str) -> None:
     try:
-        price = await _fetch_price(bot.request_timeout)
+        price = await _get_price(bot.request_timeout)
     except Exception:
         logger.exception("Failed to fetch BTC price")
         await bot.privmsg(channel, "BTC price unavailable")
@@ -68,12 +77,39 @@ async def _handle_bitcoin_command(bot, channel: str) -> None:
     await bot.privmsg(channel, f"$ {price}")
 
 
+def _cached_price() -> Optional[int]:
+    if _cache_price is not None and time.monotonic() - _cache_ts < settings.cache_ttl_secs:
+        return _cache_price
+    return None
+
+
+async def _get_price(timeout: int) -> int:
+    """Return the BTC price, hitting CoinGecko at most once per cache TTL."""
+    global _cache_price, _cache_ts, _cache_lock
+    price = _cached_price()
+    if price is not None:
+        return price
+
+    if _cache_lock is None:
+        _cache_lock = asyncio.Lock()
+    async with _cache_lock:
+        # Another caller may have refreshed while we waited.
+        price = _cached_price()
+        if price is not None:
+            return price
+        price = await _fetch_price(timeout)
+        _cache_price = price
+        _cache_ts = time.monotonic()
+        return price
+
+
 async def _fetch_price(timeout: int) -> int:
-    from core.utils import async_http_get
+    from core.utils import async_http_get, host_semaphore, json_loads
 
-    response = await async_http_get(API_URL, params=API_PARAMS, timeout=timeout)
+    async with host_semaphore(API_HOST, API_MAX_CONCURRENT):
+        response = await async_http_get(API_URL, params=API_PARAMS, timeout=timeout)
     response.raise_for_status()
-    payload = response.json()
+    payload = json_loads(response.content)
     price = payload.get("bitcoin", {}).get("usd")
     if price is None:
         raise ValueError("Unexpected response payload")
@@ -82,11 +118,16 @@ async def _fetch_price(timeout: int) -> int:
 
 def _settings_from_config(bot) -> BitcoinSettings:
     from core.utils import get_plugin_config
-    get_plugin_config(bot, "bitcoin")  # validate config exists
+    config = get_plugin_config(bot, "bitcoin")
 
     default_triggers = tuple(CONFIG_DEFAULTS["plugins"]["bitcoin"]["triggers"])
+    default_ttl = CONFIG_DEFAULTS["plugins"]["bitcoin"]["cache_ttl_secs"]
+    try:
+        cache_ttl = max(0.0, float(config.get("cache_ttl_secs", default_ttl)))
+    except (TypeError, ValueError):
+        cache_ttl = float(default_ttl)
     # Triggers are script-defined; ignore config overrides
-    return BitcoinSettings(triggers=default_triggers)
+    return BitcoinSettings(triggers=default_triggers, cache_ttl_secs=cache_ttl)
 
 
  
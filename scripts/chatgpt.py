@@ -9,6 +9,7 @@ plugins:
     enabled: true
     api_key: "<openai_api_key>"
     model: "gpt-4o-mini"  # optional, defaults to gpt-4o-mini
+    max_channels: 256      # optional, channels whose history is kept
 ```
 
 Only `api_key` is required. If omitted, the plugin stays disabled.
@@ -18,14 +19,14 @@ import asyncio
 import logging
 import re
 import time
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List, Optional, Tuple
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
 
 try:
-    from openai import AuthenticationError, OpenAI, OpenAIError, RateLimitError
+    from openai import AsyncOpenAI, AuthenticationError, OpenAIError, RateLimitError
 except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None  # type: ignore[assignment]
+    AsyncOpenAI = None  # type: ignore[assignment]
     AuthenticationError = OpenAIError = RateLimitError = Exception  # type: ignore[misc]
 
 logger = logging.getLogger(__name__)
@@ -42,6 +43,19 @@ DEFAULT_HISTORY_LIMIT = 50
 DEFAULT_MAX_MESSAGE_LENGTH = 450
 DEFAULT_MESSAGE_DELAY = 1.0
 DEFAULT_RATE_LIMIT = 5.0
+OPENAI_MAX_RETRIES = 2
+OPENAI_TIMEOUT_SECS = 60.0
+DEFAULT_MAX_CHANNELS = 256
+MAX_RATE_ENTRIES = 1024
+OPENAI_MAX_CONCURRENT = 4
+_STREAM_END = object()
+HISTORY_IDLE_SECS = 24 * 60 * 60
+HISTORY_SWEEP_INTERVAL_SECS = 60 * 60
+JOKE_SUFFIX = (
+    " When asked for a joke, keep it short, witty, and on theme with Linux, "
+    "programming, or prepping."
+)
+NO_PREFIX_SUFFIX = " Do not include your name or any prefix in your responses."
 
 CONFIG_DEFAULTS = {
     "plugins": {
@@ -63,15 +77,23 @@ class ChatGPTSettings:
     max_message_length: int = DEFAULT_MAX_MESSAGE_LENGTH
     message_delay_secs: float = DEFAULT_MESSAGE_DELAY
     rate_limit_secs: float = DEFAULT_RATE_LIMIT
+    max_channels: int = DEFAULT_MAX_CHANNELS
     enabled: bool = False
 
 
 @dataclass
 class ChatGPTState:
     settings: ChatGPTSettings
-    client: Optional[OpenAI] = None  # type: ignore[type-arg]
-    history: Dict[str, Deque[Tuple[str, str]]] = field(default_factory=dict)
-    last_request: Dict[str, float] = field(default_factory=dict)
+    client: Optional[AsyncOpenAI] = None  # type: ignore[type-arg]
+    client_future: Optional[asyncio.Future] = None
+    # Channel -> chat messages ready to send to the API, least recent channel first.
+    history: "OrderedDict[str, Deque[Dict[str, str]]]" = field(default_factory=OrderedDict)
+    # Channel -> time.monotonic() of its last prompt, least recent first.
+    last_request: "OrderedDict[str, float]" = field(default_factory=OrderedDict)
+    sweeper: Optional[asyncio.Task] = None
+    # (plain, joke) system prompts formatted for system_prompt_nick.
+    system_prompts: Tuple[str, str] = ("", "")
+    system_prompt_nick: Optional[str] = None
 
 
 state: Optional[ChatGPTState] = None
@@ -85,7 +107,7 @@ def on_load(bot) -> None:
         state = ChatGPTState(settings=settings)
         return
 
-    if OpenAI is None:
+    if AsyncOpenAI is None:
         logger.info(
             "ChatGPT plugin disabled (python 'openai' package not installed). Run 'pip install openai'."
         )
@@ -93,16 +115,15 @@ def on_load(bot) -> None:
         state = ChatGPTState(settings=settings)
         return
 
-    client = None
+    # The client is built on first use (see _get_client) so loading the
+    # plugin never pays for SSL/httpx setup on the event loop thread.
+    state = ChatGPTState(settings=settings)
     try:
-        client = OpenAI(api_key=settings.api_key)
-    except Exception as exc:  # pragma: no cover - library init
-        logger.error("Failed to initialise OpenAI client: %s", exc)
-        settings.enabled = False
-        state = ChatGPTState(settings=settings)
-        return
-
-    state = ChatGPTState(settings=settings, client=client)
+        state.sweeper = asyncio.get_running_loop().create_task(
+            _sweep_idle_history(), name="chatgpt-history-sweeper"
+        )
+    except RuntimeError:
+        pass
 
     bot.plugin_manager.register_command(
         "chatgpt",
@@ -116,11 +137,64 @@ def on_load(bot) -> None:
 
 def on_unload(bot) -> None:
     global state
+    if state is not None:
+        if state.sweeper is not None:
+            state.sweeper.cancel()
+        if state.client is not None:
+            _close_client(state.client)
     state = None
     logger.info("ChatGPT plugin unloaded")
 
 
-_address_pattern_cache: tuple = ("", None)  # (nickname, compiled_pattern)
+def _build_client(api_key: str):
+    return AsyncOpenAI(
+        api_key=api_key,
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=OPENAI_TIMEOUT_SECS,
+    )
+
+
+async def _get_client():
+    """Return the OpenAI client, constructing it in the executor on first use."""
+    assert state is not None
+    if state.client is not None:
+        return state.client
+    if state.client_future is None:
+        from core.utils import run_blocking
+
+        state.client_future = asyncio.ensure_future(
+            run_blocking(_build_client, state.settings.api_key)
+        )
+    current = state
+    future = current.client_future
+    try:
+        client = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.exception("Failed to initialise OpenAI client")
+        if current.client_future is future:
+            current.client_future = None
+        raise
+    if state is not current:
+        # Unloaded while the client was being built.
+        _close_client(client)
+        raise RuntimeError("ChatGPT plugin unloaded")
+    current.client = client
+    return client
+
+
+def _close_client(client) -> None:
+    """Release the client's pooled connections without blocking the caller."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(client.close())
+        return
+    loop.create_task(client.close(), name="chatgpt-client-close")
+
+
+_address_pattern_cache: tuple = ("", "", None)  # (nickname, lowered nickname, compiled_pattern)
 
 
 def on_message(bot, user: str, channel: str, message: str) -> None:
@@ -129,15 +203,21 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
         return
 
     # Only react when bot is addressed (cached regex)
-    cached_nick, cached_re = _address_pattern_cache
+    cached_nick, nick_lower, cached_re = _address_pattern_cache
     if cached_nick != bot.nickname:
-        cached_re = re.compile(rf"^{re.escape(bot.nickname)}(\s+|[:,]\s+)(.*)", re.IGNORECASE)
-        _address_pattern_cache = (bot.nickname, cached_re)
-    match = cached_re.match(message.strip())
+        nick_lower = bot.nickname.lower()
+        cached_re = re.compile(rf"^{re.escape(bot.nickname)}(?:\s+|[:,]\s+)(.*)", re.IGNORECASE)
+        _address_pattern_cache = (bot.nickname, nick_lower, cached_re)
+
+    text = message.strip()
+    # Cheap prefix test first; most lines never mention the bot.
+    if text[: len(nick_lower)].lower() != nick_lower:
+        return
+    match = cached_re.match(text)
     if not match:
         return
 
-    prompt = match.group(2).strip()
+    prompt = match.group(1).strip()
     if not prompt:
         return
 
@@ -149,41 +229,45 @@ async def _handle_prompt(bot, channel: str, nick: str, prompt: str) -> None:
     assert state is not None
     settings = state.settings
 
-    current_time = time.time()
-    last = state.last_request.get(channel, 0.0)
-    if current_time - last < settings.rate_limit_secs:
+    current_time = time.monotonic()
+    last = state.last_request.get(channel)
+    if last is not None and current_time - last < settings.rate_limit_secs:
         await bot.privmsg(channel, "Whoa, slow down! I'm still compiling the last response.")
         return
     state.last_request[channel] = current_time
+    state.last_request.move_to_end(channel)
+    while len(state.last_request) > MAX_RATE_ENTRIES:
+        state.last_request.popitem(last=False)
+
+    history = state.history.get(channel)
+    if history is None:
+        while state.history and len(state.history) >= settings.max_channels:
+            evicted, _ = state.history.popitem(last=False)
+            state.last_request.pop(evicted, None)
+        history = state.history[channel] = deque(maxlen=settings.history_limit)
+    else:
+        state.history.move_to_end(channel)
+    history.append({"role": "user", "content": prompt})
 
-    history = state.history.setdefault(
-        channel, deque(maxlen=settings.history_limit)
-    )
-    history.append((nick, prompt))
-
-    system_prompt = settings.system_prompt or ""
-    try:
-        system_prompt = system_prompt.format(nick=bot.nickname)
-    except Exception:
-        logger.warning("System prompt formatting failed; using raw prompt.")
+    if state.system_prompt_nick != bot.nickname:
+        state.system_prompts = _build_system_prompts(settings, bot.nickname)
+        state.system_prompt_nick = bot.nickname
+    plain_prompt, joke_prompt = state.system_prompts
+    system_prompt = joke_prompt if prompt.lower().startswith("tell me a joke") else plain_prompt
 
-    if prompt.lower().startswith("tell me a joke"):
-        system_prompt += (
-            " When asked for a joke, keep it short, witty, and on theme with Linux, "
-            "programming, or prepping."
-        )
     if system_prompt:
-        system_prompt += " Do not include your name or any prefix in your responses."
-
-    messages = []
-    if system_prompt:
-        messages.append({"role": "system", "content": system_prompt})
-    for sender, text in history:
-        role = "assistant" if sender.lower() == bot.nickname.lower() else "user"
-        messages.append({"role": role, "content": text})
+        messages = [{"role": "system", "content": system_prompt}, *history]
+    else:
+        messages = list(history)
 
+    sent_parts: List[str] = []
+    chunks = _call_openai(messages, settings)
     try:
-        response_text = await _call_openai(messages, settings)
+        async for chunk in chunks:
+            if sent_parts:
+                await asyncio.sleep(max(0.0, settings.message_delay_secs))
+            await bot.privmsg(channel, chunk)
+            sent_parts.append(chunk)
     except RateLimitError:
         await bot.privmsg(
             channel, "The AI's rationing its brainpower like I ration MREs. Try again soon!"
@@ -202,59 +286,135 @@ async def _handle_prompt(bot, channel: str, nick: str, prompt: str) -> None:
             channel, f"Something broke like a bad script in prod: {exc}. Retry?"
         )
         return
+    finally:
+        # Close now rather than at garbage collection, so a cancelled handler
+        # stops the API stream straight away.
+        await chunks.aclose()
 
-    if not response_text:
+    if not sent_parts:
         await bot.privmsg(channel, "My joke generator's out of RAM. Try again?")
         return
 
-    history.append((bot.nickname, response_text))
-    await _send_split_response(bot, channel, response_text, settings)
+    history.append({"role": "assistant", "content": " ".join(sent_parts)})
+    if len(sent_parts) > 1:
+        await bot.privmsg(channel, "Response truncated. Ask for details if needed!")
+
+
+def _build_system_prompts(settings: ChatGPTSettings, nickname: str) -> Tuple[str, str]:
+    base = settings.system_prompt or ""
+    try:
+        base = base.format(nick=nickname)
+    except Exception:
+        logger.warning("System prompt formatting failed; using raw prompt.")
 
+    joke = base + JOKE_SUFFIX
+    if base:
+        base += NO_PREFIX_SUFFIX
+    return base, joke + NO_PREFIX_SUFFIX
 
-async def _call_openai(messages: List[Dict[str, str]], settings: ChatGPTSettings) -> str:
+
+async def _call_openai(
+    messages: List[Dict[str, str]], settings: ChatGPTSettings
+) -> AsyncIterator[str]:
+    """Stream the completion, yielding IRC-sized chunks as soon as they fill up."""
     if state is None or not settings.enabled:
-        return ""
-    client = state.client
-    if client is None:
-        raise RuntimeError("OpenAI client unavailable")
-
-    from core.utils import run_blocking
-    response = await run_blocking(client.chat.completions.create, model=settings.model, messages=messages)
-    choices = getattr(response, "choices", None)
-    if not choices:
-        return ""
-    message = choices[0].message
-    content = getattr(message, "content", "") if message else ""
-    return content.strip() if content else ""
-
-
-async def _send_split_response(
-    bot,
-    channel: str,
-    text: str,
-    settings: ChatGPTSettings,
-) -> None:
-    parts: List[str] = []
-    remaining = text
+        return
+    client = await _get_client()
+
+    from core.utils import host_semaphore
+
     limit = max(1, settings.max_message_length)
-    while remaining:
-        if len(remaining) <= limit:
-            parts.append(remaining)
-            break
-        split_at = remaining.rfind(" ", 0, limit)
-        if split_at == -1:
-            parts.append(remaining[:limit] + "…")
-            remaining = remaining[limit:]
-        else:
-            parts.append(remaining[:split_at])
-            remaining = remaining[split_at:].lstrip()
-
-    for idx, chunk in enumerate(parts):
-        await bot.privmsg(channel, chunk)
-        if idx < len(parts) - 1:
-            await asyncio.sleep(max(0.0, settings.message_delay_secs))
-    if len(parts) > 1 and len(text) > limit:
-        await bot.privmsg(channel, "Response truncated. Ask for details if needed!")
+    lines: "asyncio.Queue[object]" = asyncio.Queue()
+
+    # The API slot is held only while the response is read. Chunks are
+    # queued, so the caller's IRC pacing never counts against the cap.
+    async def produce() -> None:
+        try:
+            async with host_semaphore("api.openai.com", OPENAI_MAX_CONCURRENT):
+                async for chunk in _stream_chunks(client, messages, settings.model, limit):
+                    lines.put_nowait(chunk)
+        finally:
+            lines.put_nowait(_STREAM_END)
+
+    producer = asyncio.get_running_loop().create_task(produce())
+    try:
+        while True:
+            chunk = await lines.get()
+            if chunk is _STREAM_END:
+                break
+            yield chunk  # type: ignore[misc]
+        # Surfaces any API error raised after the last chunk was queued.
+        await producer
+    finally:
+        producer.cancel()
+
+
+async def _stream_chunks(
+    client, messages: List[Dict[str, str]], model: str, limit: int
+) -> AsyncIterator[str]:
+    stream = await client.chat.completions.create(model=model, messages=messages, stream=True)
+    try:
+        # Deltas are often a few characters; collect them and only join once the
+        # pending text could fill a line, so each character is copied O(1) times.
+        pieces: List[str] = []
+        pending = 0
+        async for event in stream:
+            choices = getattr(event, "choices", None)
+            if not choices:
+                continue
+            delta = getattr(choices[0], "delta", None)
+            piece = getattr(delta, "content", None) if delta else None
+            if not piece:
+                continue
+            pieces.append(piece)
+            pending += len(piece)
+            if pending <= limit:
+                continue
+            buffer = "".join(pieces)
+            start = 0
+            while len(buffer) - start > limit:
+                chunk, start = _split_chunk(buffer, start, limit)
+                if chunk:
+                    yield chunk
+            pieces = [buffer[start:]]
+            pending = len(pieces[0])
+        rest = "".join(pieces).strip()
+        if rest:
+            yield rest
+    finally:
+        # Release the HTTP response as soon as streaming stops, even when cancelled.
+        close = getattr(stream, "close", None)
+        if close is not None:
+            await close()
+
+
+def _split_chunk(text: str, start: int, limit: int) -> Tuple[str, int]:
+    """Return the next line of at most ``limit`` chars from ``start`` and where the rest begins."""
+    end = start + limit
+    split_at = text.rfind(" ", start, end)
+    if split_at <= start:
+        # No usable space: hard-break at the limit.
+        return text[start:end], end
+    rest = split_at + 1
+    while rest < len(text) and text[rest] == " ":
+        rest += 1
+    return text[start:split_at].strip(), rest
+
+
+async def _sweep_idle_history() -> None:
+    """Drop history for channels that have not prompted within HISTORY_IDLE_SECS."""
+    while True:
+        await asyncio.sleep(HISTORY_SWEEP_INTERVAL_SECS)
+        if state is None:
+            return
+        cutoff = time.monotonic() - HISTORY_IDLE_SECS
+        last_request = state.last_request
+        while last_request and next(iter(last_request.values())) < cutoff:
+            last_request.popitem(last=False)
+        for channel in list(state.history):
+            last = state.last_request.get(channel)
+            if last is None or last < cutoff:
+                del state.history[channel]
 
 
 async def _handle_reset_command(bot, user: str, channel: str, args: List[str], is_private: bool) -> None:
@@ -278,9 +438,14 @@ def _settings_from_config(bot) -> ChatGPTSettings:
 
     api_key = section.get("api_key")
     model = section.get("model", DEFAULT_MODEL)
+    try:
+        max_channels = max(1, int(section.get("max_channels", DEFAULT_MAX_CHANNELS)))
+    except (TypeError, ValueError):
+        max_channels = DEFAULT_MAX_CHANNELS
     enabled = bool(api_key)
     return ChatGPTSettings(
         api_key=str(api_key) if api_key else None,
         model=str(model),
+        max_channels=max_channels,
         enabled=enabled,
     )
@@ -1,34 +1,106 @@
 """Preview page metadata for posted links (config: `plugins.extract_url`, optional)."""
 
 import asyncio
+import codecs
+import functools
 import ipaddress
 import logging
 import re
 import socket
 import textwrap
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from html import unescape
 from html.parser import HTMLParser
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
 
 import requests
-from core.utils import atomic_write_yaml, file_lock, load_yaml_file
+from core.utils import async_file_lock, atomic_write_yaml, load_yaml_file
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - optional speedup
+    etree = None
+
 logger = logging.getLogger(__name__)
 
 
-URL_PATTERN = re.compile(r"https?://[^\s<>\u0000-\u001f]+", re.IGNORECASE)
+# The last character may not be closing punctuation, so "(see http://x.se)."
+# matches without a post-hoc rstrip.
+URL_PATTERN = re.compile(
+    r"https?://[^\s<>\x00-\x1f]*[^\s<>\x00-\x1f).,!?]", re.IGNORECASE
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+META_CHARSET_SCAN_BYTES = 2048
+# Fast path for either parser: a first chunk holding the whole <head> is
+# scanned with these instead of being tokenized.
+HEAD_CLOSE_PATTERN = re.compile(rb"</head\s*>", re.IGNORECASE)
+# Attribute values may contain ">" when quoted.
+META_TAG_PATTERN = re.compile(rb"""<meta\b((?:"[^"]*"|'[^']*'|[^'">])*)>""", re.IGNORECASE)
+# Markup the regex scan cannot read correctly; such heads go to the full parser.
+HEAD_UNSCANNABLE_PATTERN = re.compile(rb"<!--|<script\b|<style\b", re.IGNORECASE)
+TAG_ATTR_PATTERN = re.compile(rb"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+TITLE_TAG_PATTERN = re.compile(rb"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
 DEFAULT_SUMMARY_TEMPLATE = "{title}{description_part} ({host})"
 CONNECT_TIMEOUT_CAP_SECS = 5
 MAX_CONTENT_BYTES = 512_000
+READ_CHUNK_BYTES = 8192
 MAX_REDIRECTS = 3
 RETRY_TOTAL = 3
 RETRY_BACKOFF_FACTOR = 0.5
 RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 RETRY_ALLOWED_METHODS = frozenset({"GET", "HEAD"})
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Cache-Control": "no-cache",
+}
+
+# One worker per pooled connection: previews are I/O bound, and a dedicated
+# pool keeps slow sites from starving other plugins on the default executor.
+EXECUTOR_MAX_WORKERS = POOL_MAXSIZE
+# Previews allowed to hold a worker at once; the rest wait on the loop
+# instead of piling up in the executor's unbounded work queue.
+MAX_CONCURRENT_FETCHES = 16
+RECENT_PREVIEW_TTL_SECS = 60.0
+RECENT_PREVIEW_MAX_ENTRIES = 512
+# Large public sites (and their subdomains) assumed to resolve publicly, so
+# the SSRF check skips DNS for the links posted most often.
+TRUSTED_PUBLIC_SUFFIXES = frozenset({
+    "youtube.com",
+    "youtu.be",
+    "twitter.com",
+    "x.com",
+    "github.com",
+    "wikipedia.org",
+    "reddit.com",
+    "imgur.com",
+    "news.ycombinator.com",
+})
+PUBLIC_HOST_CACHE_TTL_SECS = 300.0
+PUBLIC_HOST_CACHE_MAX_ENTRIES = 1024
+
+# Shared across previews so repeat hosts reuse pooled keep-alive connections.
+_SESSION: Optional[requests.Session] = None
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_fetch_semaphore: Optional[asyncio.Semaphore] = None
+# hostname -> (is_public, time.monotonic() expiry); read from executor threads.
+_public_host_cache: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+_public_host_lock = threading.Lock()
+# Previews keyed by URL: running fetches are shared by every poster, finished
+# ones are replayed from an LRU of (time.monotonic(), reply) for a minute.
+_inflight: Dict[str, "asyncio.Task[Optional[str]]"] = {}
+_recent: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
 
 
 CONFIG_DEFAULTS = {
@@ -70,6 +142,8 @@ class ExtractSettings:
 
 
 def on_load(bot) -> None:
+    _get_session()
+    _get_executor()
     logger.info("extract_url plugin loaded from %s", __file__)
     bot.plugin_manager.register_command(
         "extract_url",
@@ -80,9 +154,62 @@ def on_load(bot) -> None:
 
 
 def on_unload(bot) -> None:
+    global _SESSION, _EXECUTOR, _fetch_semaphore
+    _fetch_semaphore = None
+    executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
+    with _public_host_lock:
+        _public_host_cache.clear()
+    for task in _inflight.values():
+        task.cancel()
+    _inflight.clear()
+    _recent.clear()
     logger.info("extract_url plugin unloaded")
 
 
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def _get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session()
+    return _SESSION
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="extract_url"
+        )
+    return _EXECUTOR
+
+
 async def _handle_url_command(bot, user: str, channel: str, args: list[str], is_private: bool) -> None:
     # Check permissions (admins/owners only)
     if not bot._has_owner_access(user):
@@ -110,7 +237,7 @@ async def _handle_url_command(bot, user: str, channel: str, args: list[str], is_
 
         updated = False
         try:
-            with file_lock(lock_path):
+            async with async_file_lock(lock_path):
                 data = load_yaml_file(config_path)
                 # Ensure structure exists
                 plugins = data.setdefault("plugins", {})
@@ -155,7 +282,8 @@ async def _handle_url_command(bot, user: str, channel: str, args: list[str], is_
 
 
 def on_message(bot, user: str, channel: str, message: str) -> None:
-    matches = list(_iter_urls(message))
+    # dict.fromkeys keeps first-seen order while dropping repeats.
+    matches = list(dict.fromkeys(_iter_urls(message)))
     if not matches:
         return
 
@@ -167,13 +295,12 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
 
 def _iter_urls(message: str) -> Iterable[str]:
     for match in URL_PATTERN.finditer(message):
-        yield match.group(0).rstrip(").,!?")
+        yield match.group(0)
 
 
 async def _handle_extract(bot, channel: str, url: str, settings: ExtractSettings) -> None:
-    from core.utils import run_blocking
     try:
-        reply = await run_blocking(_fetch_and_format_sync, url, settings, timeout=bot.request_timeout)
+        reply = await _preview_for(url, settings, bot.request_timeout)
     except Exception:
         logger.exception("Metadata lookup failed for %s", url)
         return
@@ -182,6 +309,51 @@ async def _handle_extract(bot, channel: str, url: str, settings: ExtractSettings
         await bot.privmsg(channel, reply)
 
 
+async def _preview_for(url: str, settings: ExtractSettings, timeout: int) -> Optional[str]:
+    cached = _recent.get(url)
+    if cached is not None:
+        stamp, reply = cached
+        if time.monotonic() - stamp < RECENT_PREVIEW_TTL_SECS:
+            _recent.move_to_end(url)
+            return reply
+        del _recent[url]
+
+    task = _inflight.get(url)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(
+            _fetch_preview(url, settings, timeout), name="extract_url-fetch"
+        )
+        _inflight[url] = task
+        task.add_done_callback(lambda done: _finish_preview(url, done))
+    # Shield so one caller being cancelled does not abort the fetch for the rest.
+    return await asyncio.shield(task)
+
+
+def _finish_preview(url: str, task: "asyncio.Task[Optional[str]]") -> None:
+    if _inflight.get(url) is task:
+        del _inflight[url]
+    if task.cancelled() or task.exception() is not None:
+        return
+    _recent[url] = (time.monotonic(), task.result())
+    _recent.move_to_end(url)
+    while len(_recent) > RECENT_PREVIEW_MAX_ENTRIES:
+        _recent.popitem(last=False)
+
+
+async def _fetch_preview(url: str, settings: ExtractSettings, timeout: int) -> Optional[str]:
+    if not await _validate_url_async(url, settings):
+        logger.debug("Skipping URL due to invalid scheme/host: %s", url)
+        return None
+
+    global _fetch_semaphore
+    if _fetch_semaphore is None:
+        _fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_fetch_and_format_sync, url, settings, timeout=timeout)
+    async with _fetch_semaphore:
+        return await loop.run_in_executor(_get_executor(), call)
+
+
 def _settings_from_config(bot) -> ExtractSettings:
     from core.utils import get_plugin_config
     section = get_plugin_config(bot, "extract_url")
@@ -215,44 +387,18 @@ def _fetch_and_format_sync(url: str, settings: ExtractSettings, timeout: int) ->
         logger.debug("Skipping URL due to invalid scheme/host: %s", url)
         return None
 
-    headers = {
-        "User-Agent": settings.user_agent,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Cache-Control": "no-cache",
-    }
+    headers = {"User-Agent": settings.user_agent}
     request_timeout = max(1, min(settings.timeout, timeout or settings.timeout))
     connect_timeout = min(CONNECT_TIMEOUT_CAP_SECS, request_timeout)
 
-    with requests.Session() as session:
-        retry = Retry(
-            total=RETRY_TOTAL,
-            read=RETRY_TOTAL,
-            connect=RETRY_TOTAL,
-            backoff_factor=RETRY_BACKOFF_FACTOR,
-            status_forcelist=RETRY_STATUS_CODES,
-            allowed_methods=RETRY_ALLOWED_METHODS,
-            raise_on_status=False,
-            respect_retry_after_header=True,
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        body_text, final_url = _fetch_html_with_limits_sync(
-            session,
-            safe_url,
-            headers=headers,
-            connect_timeout=connect_timeout,
-            request_timeout=request_timeout,
-        )
-    if body_text is None or final_url is None:
-        return None
-
-    parser = _MetadataParser()
-    parser.feed(body_text)
-    data = parser.metadata()
-    if not data:
+    data, final_url = _fetch_html_with_limits_sync(
+        _get_session(),
+        safe_url,
+        headers=headers,
+        connect_timeout=connect_timeout,
+        request_timeout=request_timeout,
+    )
+    if not data or final_url is None:
         return None
 
     host = urlparse(final_url).netloc or final_url
@@ -286,10 +432,8 @@ def _fetch_and_format_sync(url: str, settings: ExtractSettings, timeout: int) ->
         if summary:
             description_part = f" — {summary}"
 
-    return settings.templates.summary.format(
-        title=title,
-        description_part=description_part,
-        host=host,
+    return settings.templates.summary.format_map(
+        {"title": title, "description_part": description_part, "host": host}
     )
 
 
@@ -302,11 +446,33 @@ def _select_first(data: Dict[str, str], keys: Iterable[str]) -> Optional[str]:
 
 
 def _clean_text(value: str) -> str:
-    return " ".join(value.split())
+    return WHITESPACE_PATTERN.sub(" ", value).strip()
 
 
 
 def _validate_url(url: str, settings: Optional[ExtractSettings] = None) -> Optional[str]:
+    hostname = _allowed_hostname(url, settings)
+    if hostname is None:
+        return None
+    if not _is_public_host(hostname):
+        logger.debug("Rejected non-public host: %s", hostname)
+        return None
+    return url
+
+
+async def _validate_url_async(url: str, settings: Optional[ExtractSettings] = None) -> Optional[str]:
+    """Event-loop twin of ``_validate_url`` used before handing off to a worker."""
+    hostname = _allowed_hostname(url, settings)
+    if hostname is None:
+        return None
+    if not await _is_public_host_async(hostname):
+        logger.debug("Rejected non-public host: %s", hostname)
+        return None
+    return url
+
+
+def _allowed_hostname(url: str, settings: Optional[ExtractSettings]) -> Optional[str]:
+    """Return the URL's hostname unless the scheme or an excluded domain rules it out."""
     parsed = urlparse(url)
     if parsed.scheme.lower() not in {"http", "https"}:
         return None
@@ -324,25 +490,77 @@ def _validate_url(url: str, settings: Optional[ExtractSettings] = None) -> Optio
         if subset in excluded:
             logger.debug("Skipping excluded domain: %s (matched %s)", hostname, subset)
             return None
-
-    if not _is_public_host(parsed.hostname):
-        logger.debug("Rejected non-public host: %s", parsed.hostname)
-        return None
-    return url
+    return hostname
 
 
 def _is_public_host(hostname: str) -> bool:
-    try:
-        ip_obj = ipaddress.ip_address(hostname)
-        return ip_obj.is_global
-    except ValueError:
-        pass  # Not a literal IP; resolve DNS below.
+    verdict = _known_public_host(hostname)
+    if verdict is not None:
+        return verdict
 
     try:
         infos = socket.getaddrinfo(hostname, None)
     except socket.gaierror:
         return False
+    return _remember_public_host(hostname, infos)
+
+
+async def _is_public_host_async(hostname: str) -> bool:
+    verdict = _known_public_host(hostname)
+    if verdict is not None:
+        return verdict
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(hostname, None)
+    except socket.gaierror:
+        return False
+    return _remember_public_host(hostname, infos)
 
+
+def _known_public_host(hostname: str) -> Optional[bool]:
+    """Answer from a literal IP or the TTL cache; None means DNS is needed."""
+    try:
+        ip_obj = ipaddress.ip_address(hostname)
+        return ip_obj.is_global
+    except ValueError:
+        pass  # Not a literal IP; consult the cache.
+
+    key = hostname.lower()
+    if _is_trusted_host(key):
+        return True
+    with _public_host_lock:
+        cached = _public_host_cache.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            _public_host_cache.move_to_end(key)
+            return cached[0]
+    return None
+
+
+def _is_trusted_host(hostname: str) -> bool:
+    if hostname in TRUSTED_PUBLIC_SUFFIXES:
+        return True
+    dot = hostname.find(".")
+    while dot != -1:
+        if hostname[dot + 1 :] in TRUSTED_PUBLIC_SUFFIXES:
+            return True
+        dot = hostname.find(".", dot + 1)
+    return False
+
+
+def _remember_public_host(hostname: str, infos) -> bool:
+    # Resolution failures never reach here: they may be transient, so they
+    # are not cached.
+    verdict = _addresses_are_public(infos)
+    key = hostname.lower()
+    with _public_host_lock:
+        _public_host_cache[key] = (verdict, time.monotonic() + PUBLIC_HOST_CACHE_TTL_SECS)
+        _public_host_cache.move_to_end(key)
+        while len(_public_host_cache) > PUBLIC_HOST_CACHE_MAX_ENTRIES:
+            _public_host_cache.popitem(last=False)
+    return verdict
+
+
+def _addresses_are_public(infos) -> bool:
     for family, _, _, _, sockaddr in infos:
         if family == socket.AF_INET:
             addr = ipaddress.ip_address(sockaddr[0])
@@ -362,8 +580,12 @@ def _fetch_html_with_limits_sync(
     headers: Dict[str, str],
     connect_timeout: float,
     request_timeout: float,
-) -> tuple[Optional[str], Optional[str]]:
+) -> tuple[Optional[Dict[str, str]], Optional[str]]:
+    """Return ``(metadata, final_url)``, reading no further than the end of ``<head>``."""
     current_url = url
+    # The caller validated the starting host; same-host hops (http -> https,
+    # trailing slashes) need no second check.
+    verified_host = (urlparse(url).hostname or "").lower()
     for _ in range(MAX_REDIRECTS + 1):
         try:
             response = session.get(
@@ -390,13 +612,20 @@ def _fetch_html_with_limits_sync(
             if parsed_next.scheme.lower() not in {"http", "https"}:
                 logger.debug("Redirect blocked due to scheme: %s", next_url)
                 return None, None
-            host = parsed_next.hostname
-            if not host or not _is_public_host(host):
+            host = (parsed_next.hostname or "").lower()
+            if not host or (host != verified_host and not _is_public_host(host)):
                 logger.debug("Redirect blocked to non-public host: %s", next_url)
                 return None, None
+            verified_host = host
             current_url = next_url
             continue
 
+        content_type = (response.headers.get("Content-Type") or "").lower()
+        if "text/html" not in content_type:
+            logger.debug("Skipping non-HTML content for %s (%s)", current_url, content_type)
+            response.close()
+            return None, None
+
         try:
             response.raise_for_status()
         except requests.HTTPError as exc:
@@ -413,12 +642,6 @@ def _fetch_html_with_limits_sync(
             response.close()
             return None, None
 
-        content_type = (response.headers.get("Content-Type") or "").lower()
-        if "text/html" not in content_type:
-            logger.debug("Skipping non-HTML content for %s (%s)", current_url, content_type)
-            response.close()
-            return None, None
-
         content_length = response.headers.get("Content-Length")
         if content_length:
             try:
@@ -429,38 +652,205 @@ def _fetch_html_with_limits_sync(
             except ValueError:
                 pass
 
-        body = bytearray()
-        for chunk in response.iter_content(chunk_size=8192):
+        charset = response.encoding if "charset=" in content_type else None
+        stream: Optional[_MetadataStream] = None
+        remaining = MAX_CONTENT_BYTES
+        while True:
+            # Ask for at most one byte past the cap: enough to tell a body of
+            # exactly MAX_CONTENT_BYTES from a larger one.
+            chunk = response.raw.read(min(READ_CHUNK_BYTES, remaining + 1), decode_content=True)
             if not chunk:
-                continue
-            body.extend(chunk)
-            if len(body) > MAX_CONTENT_BYTES:
+                break
+            if len(chunk) > remaining:
                 logger.debug("Aborting fetch for %s: exceeded %s bytes", current_url, MAX_CONTENT_BYTES)
                 response.close()
                 return None, None
+            if stream is None:
+                stream = _MetadataStream(charset or _sniff_charset(chunk))
+            remaining -= len(chunk)
+            stream.feed(chunk)
+            if stream.done:
+                break
         response.close()
 
-        encoding = response.encoding or response.apparent_encoding or "utf-8"
-        try:
-            text = body.decode(encoding, errors="replace")
-        except Exception:
-            logger.debug("Failed to decode response for %s with encoding %s", current_url, encoding)
+        if stream is None:
             return None, None
-        return text, current_url
+        return stream.close(), current_url
 
     logger.debug("Exceeded redirect limit for %s", url)
     return None, None
 
 
+def _sniff_charset(head: bytes) -> str:
+    match = META_CHARSET_PATTERN.search(head, 0, META_CHARSET_SCAN_BYTES)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+class _MetadataStream:
+    """Feed raw HTML chunks to lxml's C parser, or html.parser when lxml is missing.
+
+    A first chunk that already holds the whole ``<head>`` is regex-scanned
+    instead of parsed. ``done`` turns true once ``<head>`` has closed, so
+    callers can stop reading.
+    """
+
+    def __init__(self, charset: str) -> None:
+        try:
+            codecs.lookup(charset)
+        except LookupError:
+            charset = "utf-8"
+        self._charset = charset
+        self._first_chunk = True
+        self._fast_meta: Optional[Dict[str, str]] = None
+        self._decoder = None
+        if etree is not None:
+            self._collector: Any = _MetadataTarget()
+            try:
+                self._parser = etree.HTMLParser(target=self._collector, encoding=charset)
+            except LookupError:
+                self._parser = etree.HTMLParser(target=self._collector, encoding="utf-8")
+            return
+
+        self._collector = self._parser = _MetadataParser()
+        self._decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+
+    @property
+    def done(self) -> bool:
+        return self._fast_meta is not None or self._collector.done
+
+    def feed(self, chunk: bytes) -> None:
+        if self._first_chunk:
+            self._first_chunk = False
+            self._fast_meta = _scan_head_metadata(chunk, self._charset)
+        if self._fast_meta is not None:
+            return
+        if self._decoder is not None:
+            self._parser.feed(self._decoder.decode(chunk))
+            return
+        try:
+            self._parser.feed(chunk)
+        except etree.LxmlError:
+            logger.debug("lxml rejected a metadata chunk", exc_info=True)
+
+    def close(self) -> Dict[str, str]:
+        if self._fast_meta is not None:
+            return dict(self._fast_meta)
+        if self._decoder is not None:
+            self._parser.feed(self._decoder.decode(b"", final=True))
+            self._parser.close()
+        else:
+            try:
+                self._parser.close()
+            except etree.LxmlError:
+                logger.debug("lxml stopped early while parsing metadata", exc_info=True)
+        return self._collector.metadata()
+
+
+def _scan_head_metadata(chunk: bytes, charset: str) -> Optional[Dict[str, str]]:
+    """Regex-scan a complete ``<head>``; None sends the caller to the full parser."""
+    head_end = HEAD_CLOSE_PATTERN.search(chunk)
+    if head_end is None:
+        return None
+    head = chunk[: head_end.start()]
+    if HEAD_UNSCANNABLE_PATTERN.search(head):
+        return None
+
+    def _text(raw: bytes) -> str:
+        return unescape(raw.decode(charset, errors="replace"))
+
+    meta: Dict[str, str] = {}
+    for tag in META_TAG_PATTERN.finditer(head):
+        prop = name = content = None
+        for attr in TAG_ATTR_PATTERN.finditer(tag.group(1)):
+            key = attr.group(1).lower()
+            if key not in (b"content", b"property", b"name"):
+                continue
+            raw = attr.group(2)
+            if raw is None:
+                raw = attr.group(3) if attr.group(3) is not None else attr.group(4)
+            if key == b"content":
+                content = _text(raw)
+            elif key == b"property":
+                prop = _text(raw)
+            else:
+                name = _text(raw)
+        _record_meta(meta, prop, name, content)
+
+    title = TITLE_TAG_PATTERN.search(head)
+    if title is not None:
+        text = _text(title.group(1)).strip()
+        if text:
+            meta["title"] = text
+    return meta or None
+
+
+def _record_meta(
+    meta: Dict[str, str], prop: Optional[str], name: Optional[str], content: Optional[str]
+) -> None:
+    if not content:
+        return
+
+    prop = prop.lower() if prop else ""
+    name = name.lower() if name else ""
+
+    if prop.startswith("og:"):
+        meta[prop] = content
+    elif name.startswith("twitter:"):
+        meta[f"twitter:{name[8:]}"] = content
+    elif name == "description" and "description" not in meta:
+        meta["description"] = content
+
+
+class _MetadataTarget:
+    """lxml parser target mirroring ``_MetadataParser``."""
+
+    def __init__(self) -> None:
+        self._meta: Dict[str, str] = {}
+        self._in_title = False
+        self._title_chunks: list[str] = []
+        self.done = False
+
+    def start(self, tag: str, attrib) -> None:
+        if tag == "body":
+            self.done = True
+        elif tag == "title":
+            self._in_title = True
+            self._title_chunks.clear()
+        elif tag == "meta":
+            _record_meta(self._meta, attrib.get("property"), attrib.get("name"), attrib.get("content"))
+
+    def end(self, tag: str) -> None:
+        if tag == "head":
+            self.done = True
+        elif tag == "title":
+            self._in_title = False
+            if self._title_chunks and "title" not in self._meta:
+                self._meta["title"] = "".join(self._title_chunks).strip()
+
+    def data(self, data: str) -> None:
+        if self._in_title:
+            self._title_chunks.append(data)
+
+    def close(self) -> None:
+        return None
+
+    def metadata(self) -> Dict[str, str]:
+        return dict(self._meta)
+
+
 class _MetadataParser(HTMLParser):
     def __init__(self) -> None:
         super().__init__()
         self._meta: Dict[str, str] = {}
         self._in_title = False
         self._title_chunks: list[str] = []
+        self.done = False
 
     def handle_starttag(self, tag: str, attrs) -> None:
-        attr_map = dict(attrs)
+        if tag == "body":
+            self.done = True
+            return
+
         if tag == "title":
             self._in_title = True
             self._title_chunks.clear()
@@ -469,22 +859,21 @@ class _MetadataParser(HTMLParser):
         if tag != "meta":
             return
 
-        content = attr_map.get("content")
-        if not content:
-            return
-
-        prop = (attr_map.get("property") or "").lower()
-        name = (attr_map.get("name") or "").lower()
-
-        if prop.startswith("og:"):
-            self._meta[prop] = content
-        elif name.startswith("twitter:"):
-            self._meta[f"twitter:{name[8:]}"] = content
-        elif name == "description" and "description" not in self._meta:
-            self._meta["description"] = content
+        # Single pass over the attribute pairs instead of building a dict.
+        prop = name = content = None
+        for key, value in attrs:
+            if key == "content":
+                content = value
+            elif key == "property":
+                prop = value
+            elif key == "name":
+                name = value
+        _record_meta(self._meta, prop, name, content)
 
     def handle_endtag(self, tag: str) -> None:
-        if tag == "title":
+        if tag == "head":
+            self.done = True
+        elif tag == "title":
             self._in_title = False
             if self._title_chunks and "title" not in self._meta:
                 self._meta["title"] = "".join(self._title_chunks).strip()
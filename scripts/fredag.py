@@ -28,7 +28,8 @@ def on_unload(bot) -> None:
 
 
 def on_message(bot, user: str, channel: str, message: str) -> None:
-    if not FRIDAY_PATTERN.search(message):
+    # Substring probe first: the regex only runs on the rare lines that could match.
+    if "fredag" not in message.lower() or not FRIDAY_PATTERN.search(message):
         return
 
     loop = asyncio.get_running_loop()
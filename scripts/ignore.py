@@ -4,9 +4,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Dict, Iterable, Set
+from typing import Dict, FrozenSet, Iterable, Set, Tuple
 
-from core.utils import atomic_write_yaml, file_lock, load_yaml_file
+from core.utils import atomic_write_yaml, file_lock, get_plugin_config, load_yaml_file
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,11 @@ CONFIG_DEFAULTS = {
 
 
 STATE_KEY = "_ignore_plugin_state"
+COMMANDS = frozenset({"ignore", "unignore", "ignored"})
+
+# (owner_nicks object, lower-cased copy). IRCClient rebinds owner_nicks on
+# every change, so an identity check is enough to invalidate.
+_owner_cache: Tuple[object, FrozenSet[str]] = (None, frozenset())
 
 
 def on_load(bot) -> None:
@@ -33,13 +38,15 @@ def on_load(bot) -> None:
 
 
 def on_unload(bot) -> None:
+    global _owner_cache
+    _owner_cache = (None, frozenset())
     bot.__dict__.pop(STATE_KEY, None)
     bot.ignored_nicks = set()
     logger.info("ignore plugin unloaded")
 
 
 def on_message(bot, user: str, channel: str, message: str) -> None:
-    prefix = getattr(bot, "prefix", ".")
+    prefix = bot.prefix
     if not message.startswith(prefix):
         return
 
@@ -49,7 +56,7 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
 
     parts = command_body.split(maxsplit=1)
     command = parts[0].lower()
-    if command not in {"ignore", "unignore", "ignored"}:
+    if command not in COMMANDS:
         return
 
     if not _is_owner(bot, user):
@@ -126,15 +133,7 @@ def _handle_list(bot, channel: str) -> None:
 
 
 def _load_ignored_from_config(bot) -> Iterable[str]:
-    plugins_section = getattr(bot, "config", {}).get("plugins", {})
-    if not isinstance(plugins_section, dict):
-        return []
-
-    ignore_section = plugins_section.get("ignore", {})
-    if not isinstance(ignore_section, dict):
-        return []
-
-    ignored = ignore_section.get("ignored_nicks", [])
+    ignored = get_plugin_config(bot, "ignore").get("ignored_nicks", [])
     if not isinstance(ignored, list):
         return []
 
@@ -151,23 +150,20 @@ def _persist_ignored(bot, ignored: Set[str]) -> None:
     if not config_path:
         return
 
+    nicks_snapshot = sorted(ignored)
+    queue_update = getattr(bot, "_queue_config_update", None)
+    if callable(queue_update):
+        # Coalesced with other pending config writes and run off the event loop.
+        queue_update("plugins.ignore", lambda data: _apply_ignored(data, nicks_snapshot))
+        return
+
     lock_path = config_path.with_suffix(config_path.suffix + ".lock")
     with file_lock(lock_path):
         data = load_yaml_file(config_path)
         if not isinstance(data, dict):
             data = {}
-
-        plugins_section = data.setdefault("plugins", {})
-        if not isinstance(plugins_section, dict):
-            plugins_section = {}
-            data["plugins"] = plugins_section
-
-        ignore_section = plugins_section.setdefault("ignore", {})
-        if not isinstance(ignore_section, dict):
-            ignore_section = {}
-            plugins_section["ignore"] = ignore_section
-
-        ignore_section["ignored_nicks"] = sorted(ignored)
+        if not _apply_ignored(data, nicks_snapshot):
+            return
 
         try:
             atomic_write_yaml(config_path, data)
@@ -175,6 +171,23 @@ def _persist_ignored(bot, ignored: Set[str]) -> None:
             logger.warning("Failed to write ignore list to config file", exc_info=True)
 
 
+def _apply_ignored(data: Dict[str, object], nicks: list) -> bool:
+    plugins_section = data.setdefault("plugins", {})
+    if not isinstance(plugins_section, dict):
+        plugins_section = {}
+        data["plugins"] = plugins_section
+
+    ignore_section = plugins_section.setdefault("ignore", {})
+    if not isinstance(ignore_section, dict):
+        ignore_section = {}
+        plugins_section["ignore"] = ignore_section
+
+    if ignore_section.get("ignored_nicks") == nicks:
+        return False
+    ignore_section["ignored_nicks"] = nicks
+    return True
+
+
 def _update_runtime_config(bot, ignored: Set[str]) -> None:
     if not hasattr(bot, "config") or not isinstance(bot.config, dict):
         return
@@ -217,6 +230,14 @@ def _is_owner(bot, user: str) -> bool:
         except Exception:
             logger.exception("ignore plugin failed to validate owner access")
             return False
-    nick = user.split("!", 1)[0]
-    owner_nicks = getattr(bot, "owner_nicks", set())
-    return nick.lower() in {name.lower() for name in owner_nicks}
+    return user.split("!", 1)[0].lower() in _owner_nicks_lower(bot)
+
+
+def _owner_nicks_lower(bot) -> FrozenSet[str]:
+    global _owner_cache
+    owner_nicks = getattr(bot, "owner_nicks", ())
+    source, lowered = _owner_cache
+    if source is not owner_nicks:
+        lowered = frozenset(name.lower() for name in owner_nicks)
+        _owner_cache = (owner_nicks, lowered)
+    return lowered
@@ -6,11 +6,14 @@ import json
 import logging
 import re
 import textwrap
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, Optional, Tuple
-from urllib.parse import urlparse
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +23,36 @@ URL_PATTERN = re.compile(
     re.IGNORECASE,
 )
 
-SUPPORTED_PATHS = {"p", "reel", "reels", "tv"}
+SHORTCODE_PATTERN = re.compile(
+    r"instagram\.com/(?P<kind>p|reel|reels|tv)/(?P<code>[^/?#\s]+)",
+    re.IGNORECASE,
+)
+
+LIKES_PATTERN = re.compile(r">([\d.,]+)([kKmM]?)\s+likes<", re.IGNORECASE)
+USERNAME_LINK_PATTERN = re.compile(r'<a class="CaptionUsername"[^>]*>([^<]+)</a>', re.IGNORECASE)
+USERNAME_JSON_PATTERN = re.compile(r'\\"username\\":\\"([^\\"]+)\\"')
+VERIFIED_MARKER = '"is_verified":true'
+CAPTION_PATTERN = re.compile(r'<div class="Caption">(.*?)</div>', re.DOTALL)
+VIEW_ALL_COMMENTS_PATTERN = re.compile(r"\bView all \d+ comments\b", re.IGNORECASE)
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+RETRY_TOTAL = 1
+RETRY_BACKOFF_FACTOR = 0.2
+RETRY_STATUS_CODES = (502, 503, 504)
+DEFAULT_HEADERS = {"Referer": "https://www.instagram.com/"}
+INSTAGRAM_HOST = "www.instagram.com"
+INSTAGRAM_MAX_CONCURRENT = 4
+SUMMARY_CACHE_TTL_SECS = 300.0
+SUMMARY_CACHE_MAX_ENTRIES = 256
+DEFAULT_SUMMARY_TEMPLATE = "{username}{verified} | likes {likes}{caption_part}"
+
+# Shared so bursts of Instagram links reuse one keep-alive connection.
+_SESSION: Optional[requests.Session] = None
+# (plugins.instagram section, settings built from it). A config reload
+# swaps in a new section dict, so an identity check is enough.
+_settings_cache: Optional[Tuple[dict, "InstagramSettings"]] = None
+# (embed path, shortcode) -> (time.monotonic(), settings used, summary).
+_summary_cache: "OrderedDict[Tuple[str, str], Tuple[float, InstagramSettings, str]]" = OrderedDict()
 
 
 CONFIG_DEFAULTS = {
@@ -32,7 +64,7 @@ CONFIG_DEFAULTS = {
             "max_urls_per_message": 2,
             "include_caption": True,
             "caption_max_chars": 160,
-            "summary_template": "{username}{verified} | likes {likes}{caption_part}",
+            "summary_template": DEFAULT_SUMMARY_TEMPLATE,
         }
     }
 }
@@ -40,7 +72,7 @@ CONFIG_DEFAULTS = {
 
 @dataclass
 class InstagramTemplates:
-    summary: str = "{username}{verified} | likes {likes}{caption_part}"
+    summary: str = DEFAULT_SUMMARY_TEMPLATE
 
 
 @dataclass
@@ -62,22 +94,59 @@ class InstagramResult:
 
 
 def on_load(bot) -> None:
+    global _settings_cache
+    _settings_cache = None
+    _get_session()
     logger.info("instagram plugin loaded from %s", __file__)
 
 
 def on_unload(bot) -> None:
+    global _SESSION, _settings_cache
+    _settings_cache = None
+    _summary_cache.clear()
+    session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
     logger.info("instagram plugin unloaded")
 
 
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def _get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session()
+    return _SESSION
+
+
 def on_message(bot, user: str, channel: str, message: str) -> None:
+    # Substring probe first: almost no line mentions Instagram at all.
+    if "instagram.com" not in message.lower():
+        return
     matches = list(_iter_urls(message))
     if not matches:
         return
 
     settings = _settings_from_config(bot)
-    loop = asyncio.get_running_loop()
-    for url in matches[: settings.max_urls_per_message]:
-        loop.create_task(_handle_instagram_url(bot, channel, url, settings))
+    urls = matches[: settings.max_urls_per_message]
+    if urls:
+        asyncio.get_running_loop().create_task(_handle_instagram_urls(bot, channel, urls, settings))
 
 
 def _iter_urls(message: str) -> Iterable[str]:
@@ -85,23 +154,34 @@ def _iter_urls(message: str) -> Iterable[str]:
         yield match.group(0).rstrip(").,!?")
 
 
-async def _handle_instagram_url(
-    bot, channel: str, url: str, settings: InstagramSettings
+async def _handle_instagram_urls(
+    bot, channel: str, urls: List[str], settings: InstagramSettings
 ) -> None:
-    from core.utils import run_blocking
-    try:
-        reply = await run_blocking(_fetch_and_format_sync, url, settings, timeout=bot.request_timeout)
-    except Exception:
-        logger.exception("Instagram lookup failed for %s", url)
-        return
-
-    if reply:
-        await bot.privmsg(channel, reply)
+    # Fetch concurrently over the shared session, then reply in message order.
+    replies = await asyncio.gather(
+        *(_fetch_and_format(url, settings, bot.request_timeout) for url in urls),
+        return_exceptions=True,
+    )
+    for url, reply in zip(urls, replies):
+        if isinstance(reply, BaseException):
+            logger.error("Instagram lookup failed for %s", url, exc_info=reply)
+            continue
+        if reply:
+            await bot.privmsg(channel, reply)
 
 
 def _settings_from_config(bot) -> InstagramSettings:
+    global _settings_cache
     from core.utils import get_plugin_config
     section = get_plugin_config(bot, "instagram")
+    if _settings_cache is not None and _settings_cache[0] is section:
+        return _settings_cache[1]
+    settings = _build_settings(section)
+    _settings_cache = (section, settings)
+    return settings
+
+
+def _build_settings(section: dict) -> InstagramSettings:
 
     defaults = InstagramSettings()
     templates = InstagramTemplates(
@@ -125,7 +205,7 @@ def _settings_from_config(bot) -> InstagramSettings:
     )
 
 
-def _fetch_and_format_sync(
+async def _fetch_and_format(
     url: str, settings: InstagramSettings, timeout: int
 ) -> Optional[str]:
     media_type, shortcode = _extract_path_and_shortcode(url)
@@ -133,42 +213,49 @@ def _fetch_and_format_sync(
         logger.debug("Unable to parse Instagram URL: %s", url)
         return None
 
-    result = _fetch_instagram_data_sync(media_type, shortcode, settings, timeout)
+    key = ("reel" if media_type == "reels" else media_type, shortcode)
+    cached = _summary_cache.get(key)
+    if cached is not None:
+        stamp, cached_settings, summary = cached
+        if cached_settings is settings and time.monotonic() - stamp < SUMMARY_CACHE_TTL_SECS:
+            _summary_cache.move_to_end(key)
+            return summary
+        del _summary_cache[key]
+
+    result = await _fetch_instagram_data(media_type, shortcode, settings, timeout)
     if result is None:
         return None
 
-    return _render_summary(result, settings)
+    summary = _render_summary(result, settings)
+    _summary_cache[key] = (time.monotonic(), settings, summary)
+    _summary_cache.move_to_end(key)
+    while len(_summary_cache) > SUMMARY_CACHE_MAX_ENTRIES:
+        _summary_cache.popitem(last=False)
+    return summary
 
 
 def _extract_path_and_shortcode(url: str) -> Tuple[Optional[str], Optional[str]]:
-    parsed = urlparse(url)
-    segments = [segment for segment in parsed.path.split("/") if segment]
-    if not segments:
+    match = SHORTCODE_PATTERN.search(url)
+    if match is None:
         return None, None
-
-    for idx, segment in enumerate(segments):
-        if segment.lower() in SUPPORTED_PATHS and idx + 1 < len(segments):
-            return segment.lower(), segments[idx + 1]
-
-    if segments[0].lower() in SUPPORTED_PATHS:
-        return segments[0].lower(), segments[1] if len(segments) > 1 else None
-
-    return None, None
+    return match.group("kind").lower(), match.group("code")
 
 
-def _fetch_instagram_data_sync(
+async def _fetch_instagram_data(
     media_type: str, shortcode: str, settings: InstagramSettings, timeout: int
 ) -> Optional[InstagramResult]:
+    from core.utils import host_semaphore, run_blocking
+
     embed_path = "reel" if media_type == "reels" else media_type
     embed_url = f"https://www.instagram.com/{embed_path}/{shortcode}/embed/captioned/"
-    headers = {
-        "User-Agent": settings.user_agent,
-        "Referer": "https://www.instagram.com/",
-    }
+    headers = {"User-Agent": settings.user_agent}
 
     request_timeout = max(1, min(settings.timeout, timeout or settings.timeout))
     try:
-        response = requests.get(embed_url, headers=headers, timeout=request_timeout)
+        async with host_semaphore(INSTAGRAM_HOST, INSTAGRAM_MAX_CONCURRENT):
+            response = await run_blocking(
+                _get_session().get, embed_url, headers=headers, timeout=request_timeout
+            )
         response.raise_for_status()
     except requests.RequestException as exc:
         logger.debug("Instagram request failed for %s: %s", embed_url, exc)
@@ -181,10 +268,10 @@ def _fetch_instagram_data_sync(
 
 
 def _parse_embed_html(source: str) -> Optional[InstagramResult]:
-    likes = _parse_number(r">([\d.,]+)([kKmM]?)\s+likes<", source)
+    likes = _parse_number(LIKES_PATTERN, source)
     username = _parse_username(source)
     caption = _parse_caption(source)
-    verified = bool(re.search(r'"is_verified":true', source))
+    verified = VERIFIED_MARKER in source
 
     if not username and likes is None and caption is None:
         return None
@@ -197,8 +284,8 @@ def _parse_embed_html(source: str) -> Optional[InstagramResult]:
     )
 
 
-def _parse_number(pattern: str, source: str) -> Optional[int]:
-    match = re.search(pattern, source, flags=re.IGNORECASE)
+def _parse_number(pattern: "re.Pattern[str]", source: str) -> Optional[int]:
+    match = pattern.search(source)
     if not match:
         return None
     number_text = match.group(1).replace(",", "")
@@ -224,33 +311,54 @@ def _parse_number(pattern: str, source: str) -> Optional[int]:
 
 
 def _parse_username(source: str) -> Optional[str]:
-    match = re.search(
-        r'<a class="CaptionUsername"[^>]*>([^<]+)</a>', source, flags=re.IGNORECASE
-    )
+    match = USERNAME_LINK_PATTERN.search(source)
     if match:
         return html.unescape(match.group(1).strip())
 
-    match = re.search(r'\\"username\\":\\"([^\\"]+)\\"', source)
+    match = USERNAME_JSON_PATTERN.search(source)
     if match:
         return _decode_json_string(match.group(1))
     return None
 
 
 def _parse_caption(source: str) -> Optional[str]:
-    match = re.search(r'<div class="Caption">(.*?)</div>', source, flags=re.DOTALL)
+    match = CAPTION_PATTERN.search(source)
     if not match:
         return None
 
-    raw = match.group(1)
-    raw = re.sub(r"<br\s*/?>", "\n", raw, flags=re.IGNORECASE)
-    cleaned = re.sub(r"<.*?>", "", raw)
-    cleaned = html.unescape(cleaned).strip()
-    cleaned = re.split(r"\bView all \d+ comments\b", cleaned, maxsplit=1, flags=re.IGNORECASE)[
-        0
-    ].strip()
+    # Literal probes first; most captions have no markup, entities or footer.
+    cleaned = match.group(1)
+    if "<" in cleaned:
+        cleaned = _strip_tags(cleaned)
+    if "&" in cleaned:
+        cleaned = html.unescape(cleaned)
+    cleaned = cleaned.strip()
+    if "view all " in cleaned.lower():
+        cleaned = VIEW_ALL_COMMENTS_PATTERN.split(cleaned, maxsplit=1)[0].strip()
     return cleaned or None
 
 
+def _strip_tags(fragment: str) -> str:
+    """Drop markup in one left-to-right pass, turning ``<br>`` into newlines."""
+    parts = []
+    pos = 0
+    while True:
+        start = fragment.find("<", pos)
+        if start == -1:
+            parts.append(fragment[pos:])
+            break
+        end = fragment.find(">", start + 1)
+        if end == -1:
+            parts.append(fragment[pos:])
+            break
+        parts.append(fragment[pos:start])
+        tag = fragment[start + 1 : end].strip().rstrip("/").strip().lower()
+        if tag == "br":
+            parts.append("\n")
+        pos = end + 1
+    return "".join(parts)
+
+
 def _decode_json_string(value: str) -> str:
     try:
         return json.loads(f'"{value}"')
@@ -269,11 +377,13 @@ def _render_summary(result: InstagramResult, settings: InstagramSettings) -> str
         caption_part = f" | caption: {summary}"
 
     verified = " ✓" if result.is_verified else ""
-    return settings.templates.summary.format(
-        username=result.username,
-        verified=verified,
-        likes=likes,
-        caption_part=caption_part,
+    return settings.templates.summary.format_map(
+        {
+            "username": result.username,
+            "verified": verified,
+            "likes": likes,
+            "caption_part": caption_part,
+        }
     )
 
 
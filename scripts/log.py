@@ -2,16 +2,29 @@
 
 import asyncio
 import logging
+import queue
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_STORAGE_NAME = "irc_logs.db"
 DEFAULT_MAX_MESSAGE_LENGTH = 2000
+SCHEMA_VERSION = 2
+WRITE_BATCH_SIZE = 200
+WRITE_FLUSH_INTERVAL_SECS = 2.0
+# How long unload (on the event loop) waits for the writer before leaving it
+# to finish its last flush on its own.
+WRITER_STOP_TIMEOUT_SECS = 0.5
+
+_INSERT_SQL = (
+    "INSERT INTO messages (event_type, nick, user, channel, message, timestamp) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
 
 CONFIG_DEFAULTS = {
     "plugins": {
@@ -36,13 +49,37 @@ class LogSettings:
     max_message_length: int = DEFAULT_MAX_MESSAGE_LENGTH
     log_joins_parts: bool = False
     log_actions: bool = True
+    # Lower-cased mirror of ``channels`` for the per-event lookup; call
+    # refresh_channels() after mutating ``channels``.
+    _channels_lower: FrozenSet[str] = field(default=frozenset(), repr=False)
+
+    def __post_init__(self) -> None:
+        self.refresh_channels()
+
+    def refresh_channels(self) -> None:
+        self._channels_lower = frozenset(c.lower() for c in self.channels)
+
+
+class LogEntry(NamedTuple):
+    """A queued event, in _INSERT_SQL column order minus the timestamp.
+
+    A plain tuple underneath, so the writer can append the timestamp and
+    hand rows straight to executemany.
+    """
+
+    event_type: str
+    nick: str
+    user: str
+    channel: str
+    message: str
 
 
 @dataclass
 class LogState:
     settings: LogSettings
     db: Optional[sqlite3.Connection] = None
-    _write_queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    _write_queue: "queue.SimpleQueue" = field(default_factory=queue.SimpleQueue)
+    _writer: Optional[threading.Thread] = None
 
 
 state: Optional[LogState] = None
@@ -53,7 +90,7 @@ def on_load(bot) -> None:
     settings = _settings_from_config(bot)
     db = _init_database(settings.storage_path)
     state = LogState(settings=settings, db=db)
-    _start_writer_task()
+    _start_writer_thread()
     channel_list = ", ".join(sorted(settings.channels)) if settings.channels else "none"
     logger.info(
         "log plugin loaded from %s; logging channels: %s",
@@ -83,7 +120,7 @@ def on_load(bot) -> None:
 def on_unload(bot) -> None:
     global state
     if state:
-        _stop_writer_task()
+        _stop_writer_thread()
         if state.db:
             state.db.close()
         state = None
@@ -99,8 +136,8 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
     if not _should_log_channel(channel):
         return
 
-    # Extract nick from user prefix
-    nick = _nick_from_prefix(user)
+    # Extract nick from user prefix (inlined _nick_from_prefix; this is the hot path)
+    nick = user.partition("!")[0]
     if not nick:
         return
 
@@ -146,33 +183,31 @@ def _should_log_channel(channel: str) -> bool:
     """Check if a channel should be logged."""
     if state is None:
         return False
-    if not state.settings.channels:
-        return False
     # Case-insensitive match
-    return channel.lower() in {c.lower() for c in state.settings.channels}
+    return channel.lower() in state.settings._channels_lower
 
 
 def _nick_from_prefix(prefix: str) -> str:
     """Extract nick from IRC user prefix."""
-    if not prefix:
-        return ""
-    return prefix.split("!", 1)[0]
+    return prefix.partition("!")[0]
 
 
 def _queue_log_entry(event_type: str, nick: str, user: str, channel: str, message: str) -> None:
-    """Queue a log entry for async writing."""
+    """Queue a log entry for async writing.
+
+    Channel and nick are stored lower-cased so searches can match them
+    directly against the indexes; ``user`` keeps the original prefix. The
+    writer stamps the timestamp when it picks the entry up.
+    """
     if state is None:
         return
-    try:
-        state._write_queue.put_nowait((event_type, nick, user, channel, message, time.time()))
-    except asyncio.QueueFull:
-        logger.warning("Log write queue full; dropping entry")
+    state._write_queue.put(LogEntry(event_type, nick.lower(), user, channel.lower(), message))
 
 
 def _init_database(db_path: Path) -> sqlite3.Connection:
     """Initialize SQLite database with messages table."""
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path), check_same_thread=False)
+    conn = _connect(db_path)
     conn.execute("""
         CREATE TABLE IF NOT EXISTS messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -184,22 +219,55 @@ def _init_database(db_path: Path) -> sqlite3.Connection:
             message TEXT NOT NULL
         )
     """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_timestamp ON messages(timestamp)
-    """)
-    conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_channel ON messages(channel)
-    """)
+    # Every index costs a btree update per insert; (channel, timestamp)
+    # already covers channel-only lookups, so drop the older single-column ones.
+    conn.execute("DROP INDEX IF EXISTS idx_timestamp")
+    conn.execute("DROP INDEX IF EXISTS idx_channel")
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_nick ON messages(nick)
     """)
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_channel_timestamp ON messages(channel, timestamp)
     """)
+    _migrate_database(conn)
     conn.commit()
     return conn
 
 
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection with the plugin's journal and cache settings."""
+    conn = sqlite3.connect(str(db_path))
+    # WAL lets logsearch read while the writer commits and, with NORMAL
+    # sync, only fsyncs on checkpoints rather than on every batch.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8000")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    return conn
+
+
+def _migrate_database(conn: sqlite3.Connection) -> None:
+    """Bring an existing database up to SCHEMA_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 2:
+        # Rows written before channel/nick were normalised at insert time.
+        # Lowercase with str.lower like inserts and lookups do; SQLite's
+        # LOWER() only folds ASCII (version 1 used it, hence the re-run).
+        conn.create_function("PY_LOWER", 1, _sql_lower)
+        with conn:
+            conn.execute(
+                "UPDATE messages SET channel = PY_LOWER(channel), nick = PY_LOWER(nick) "
+                "WHERE channel != PY_LOWER(channel) OR nick != PY_LOWER(nick)"
+            )
+    if version != SCHEMA_VERSION:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _sql_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
 def _settings_from_config(bot) -> LogSettings:
     """Load settings from bot config."""
     from core.utils import get_plugin_config
@@ -245,88 +313,105 @@ def _settings_from_config(bot) -> LogSettings:
     )
 
 
-_writer_task: Optional[asyncio.Task] = None
+def _start_writer_thread() -> None:
+    """Start the writer thread for the current state."""
+    if state is None or (state._writer is not None and state._writer.is_alive()):
+        return
+    state._writer = threading.Thread(
+        target=_writer_thread,
+        args=(state.settings.storage_path, state._write_queue),
+        name="log-writer",
+        # Not a daemon: interpreter exit waits for the last batch to be written.
+        daemon=False,
+    )
+    state._writer.start()
 
 
-def _start_writer_task() -> None:
-    """Start the async writer task."""
-    global _writer_task
-    if _writer_task is None or _writer_task.done():
-        loop = asyncio.get_event_loop()
-        _writer_task = loop.create_task(_writer_loop(), name="log-writer")
+def _stop_writer_thread(timeout: float = WRITER_STOP_TIMEOUT_SECS) -> None:
+    """Ask the writer thread to flush and exit, waiting at most ``timeout``.
 
+    The thread keeps its own queue and connection, so one that is still
+    mid-write simply finishes in the background.
+    """
+    if state is None or state._writer is None:
+        return
+    state._write_queue.put(None)
+    state._writer.join(timeout=timeout)
+    if state._writer.is_alive():
+        logger.info("Log writer thread is still flushing; it will exit when done")
+    state._writer = None
 
-def _stop_writer_task() -> None:
-    """Stop the async writer task."""
-    global _writer_task
-    if _writer_task and not _writer_task.done():
-        _writer_task.cancel()
-        try:
-            asyncio.get_event_loop().run_until_complete(_writer_task)
-        except asyncio.CancelledError:
-            pass
-    _writer_task = None
 
+def _writer_thread(db_path: Path, entries: "queue.SimpleQueue") -> None:
+    """Write queued log entries to the database until a ``None`` sentinel arrives
+    or the main thread has exited.
 
-async def _writer_loop() -> None:
-    """Background task that writes queued log entries to database."""
-    if state is None or state.db is None:
+    Runs on its own thread with its own connection so commits never block
+    the event loop.
+    """
+    try:
+        conn = _connect(db_path)
+    except Exception:
+        logger.exception("Log writer could not open %s", db_path)
         return
 
-    from core.utils import run_blocking
-
     batch: List[tuple] = []
-    batch_size = 50
-    flush_interval = 5.0
+    batch_size = WRITE_BATCH_SIZE
+    flush_interval = WRITE_FLUSH_INTERVAL_SECS
+    stopping = False
 
-    while True:
-        try:
+    try:
+        while not stopping:
             # Wait for entry with timeout for periodic flush
             try:
-                entry = await asyncio.wait_for(state._write_queue.get(), timeout=flush_interval)
-                batch.append(entry)
-            except asyncio.TimeoutError:
-                # Timeout - flush if we have entries
+                entry = entries.get(timeout=flush_interval)
+            except queue.Empty:
                 if batch:
-                    # Offload the blocking SQLite write so the event loop stays responsive.
-                    await run_blocking(_flush_batch, list(batch))
+                    _flush_batch(conn, batch)
                     batch.clear()
+                # Plugins are not unloaded on bot shutdown, so no sentinel
+                # comes; stop once the main thread has finished instead of
+                # holding the process open.
+                stopping = not threading.main_thread().is_alive()
                 continue
 
-            # Flush when batch is full
-            if len(batch) >= batch_size:
-                await run_blocking(_flush_batch, list(batch))
-                batch.clear()
+            # The writer wakes as soon as something is queued, so one clock
+            # read covers every entry drained in this pass.
+            now = time.time()
+            while entry is not None:
+                batch.append(entry + (now,))
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    entry = entries.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = entry is None
 
-        except asyncio.CancelledError:
-            # Flush remaining entries synchronously on shutdown (can't await while cancelling).
-            if batch:
-                _flush_batch(batch)
-            break
-        except Exception:
-            logger.exception("Error in log writer loop")
+            if stopping or len(batch) >= batch_size:
+                _flush_batch(conn, batch)
+                batch.clear()
+    except Exception:
+        logger.exception("Error in log writer thread")
+    finally:
+        if batch:
+            _flush_batch(conn, batch)
+        conn.close()
 
 
-def _flush_batch(batch: List[tuple]) -> None:
+def _flush_batch(conn: sqlite3.Connection, batch: List[tuple]) -> None:
     """Write a batch of log entries to the database."""
-    if state is None or state.db is None or not batch:
+    if not batch:
         return
 
     try:
-        state.db.executemany(
-            """
-            INSERT INTO messages (event_type, nick, user, channel, message, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """,
-            batch,
-        )
-        state.db.commit()
+        # The connection context manager commits, or rolls back on error.
+        with conn:
+            # Take the write lock once up front for the whole batch.
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_INSERT_SQL, batch)
     except Exception:
         logger.exception("Failed to write log batch to database")
-        try:
-            state.db.rollback()
-        except Exception:
-            pass
 
 
 async def _handle_log_search(bot, user: str, channel: str, args: List[str], is_private: bool) -> None:
@@ -366,7 +451,9 @@ async def _handle_log_search(bot, user: str, channel: str, args: List[str], is_p
 
         # Send results (may need to split if too long)
         for entry in results:
-            event_type, nick, msg, ts = entry
+            event_type, prefix, msg, ts = entry
+            # Show the nick as it was written, not the normalised column.
+            nick = _nick_from_prefix(prefix)
             time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
             if event_type == "message":
                 preview = msg[:100] + "..." if len(msg) > 100 else msg
@@ -392,28 +479,28 @@ def _search_logs(channel: str, nick: Optional[str] = None, limit: int = 10) -> L
         return []
 
     try:
-        # Case-insensitive channel search
+        # Stored values are lower-cased, so plain equality hits the indexes
         if nick:
             cursor = state.db.execute(
                 """
-                SELECT event_type, nick, message, timestamp
+                SELECT event_type, user, message, timestamp
                 FROM messages
-                WHERE LOWER(channel) = LOWER(?) AND LOWER(nick) = LOWER(?)
+                WHERE channel = ? AND nick = ?
                 ORDER BY timestamp DESC
                 LIMIT ?
             """,
-                (channel, nick, limit),
+                (channel.lower(), nick.lower(), limit),
             )
         else:
             cursor = state.db.execute(
                 """
-                SELECT event_type, nick, message, timestamp
+                SELECT event_type, user, message, timestamp
                 FROM messages
-                WHERE LOWER(channel) = LOWER(?)
+                WHERE channel = ?
                 ORDER BY timestamp DESC
                 LIMIT ?
             """,
-                (channel, limit),
+                (channel.lower(), limit),
             )
         return cursor.fetchall()
     except Exception:
@@ -430,12 +517,12 @@ async def _handle_log_command(bot, user: str, channel: str, args: List[str], is_
 
     # Check owner access (user is already the full IRC prefix: nick!ident@host)
     # Extract nick for logging
-    nick = user.split("!", 1)[0] if "!" in user else user
-    logger.info("Log command called by %s (user=%s)", nick, user)
-    
+    nick = user.partition("!")[0]
+    logger.debug("Log command called by %s (user=%s)", nick, user)
+
     has_access = bot._has_owner_access(user)
-    logger.info("Log command access check: user=%s, has_access=%s", user, has_access)
-    
+    logger.debug("Log command access check: user=%s, has_access=%s", user, has_access)
+
     if not has_access:
         # Try to get more info for debugging
         try:
@@ -491,11 +578,12 @@ async def _handle_log_command(bot, user: str, channel: str, args: List[str], is_
 
         if subcommand == "enable":
             # Check if already enabled (case-insensitive)
-            if any(c.lower() == target_channel.lower() for c in state.settings.channels):
+            if target_channel.lower() in state.settings._channels_lower:
                 await bot.privmsg(channel, f"Channel {target_channel} is already being logged.")
                 return
 
             state.settings.channels.add(target_channel)
+            state.settings.refresh_channels()
             await bot.privmsg(channel, f"Enabled logging for {target_channel}.")
             logger.info("Logging enabled for channel %s by %s", target_channel, _nick_from_prefix(user))
 
@@ -512,6 +600,7 @@ async def _handle_log_command(bot, user: str, channel: str, args: List[str], is_
                 return
 
             state.settings.channels.remove(to_remove)
+            state.settings.refresh_channels()
             await bot.privmsg(channel, f"Disabled logging for {target_channel}.")
             logger.info("Logging disabled for channel %s by %s", target_channel, _nick_from_prefix(user))
 
@@ -534,25 +623,21 @@ def _persist_channels_to_config(bot) -> None:
     if not config_path:
         return
 
+    channels_snapshot = sorted(state.settings.channels)
+    queue_update = getattr(bot, "_queue_config_update", None)
+    if callable(queue_update):
+        # Coalesced with other pending config writes, so rapid toggles cost one write.
+        queue_update("plugins.log", lambda data: _apply_channels(data, channels_snapshot))
+        return
+
     try:
         from core.utils import file_lock, load_yaml_file, atomic_write_yaml
 
         lock_path = config_path.with_suffix(config_path.suffix + ".lock")
         with file_lock(lock_path):
             data = load_yaml_file(config_path)
-
-            plugins_section = data.setdefault("plugins", {})
-            if not isinstance(plugins_section, dict):
-                plugins_section = {}
-                data["plugins"] = plugins_section
-
-            log_section = plugins_section.setdefault("log", {})
-            if not isinstance(log_section, dict):
-                log_section = {}
-                plugins_section["log"] = log_section
-
-            # Update channels list
-            log_section["channels"] = sorted(state.settings.channels)
+            if not _apply_channels(data, channels_snapshot):
+                return
 
             atomic_write_yaml(config_path, data)
             logger.debug("Persisted log channels to config file")
@@ -560,3 +645,20 @@ def _persist_channels_to_config(bot) -> None:
     except Exception:
         logger.exception("Failed to persist log channels to config")
 
+
+def _apply_channels(data: Dict[str, Any], channels: List[str]) -> bool:
+    """Store ``channels`` in the log section of ``data``; False if unchanged."""
+    plugins_section = data.setdefault("plugins", {})
+    if not isinstance(plugins_section, dict):
+        plugins_section = {}
+        data["plugins"] = plugins_section
+
+    log_section = plugins_section.setdefault("log", {})
+    if not isinstance(log_section, dict):
+        log_section = {}
+        plugins_section["log"] = log_section
+
+    if log_section.get("channels") == channels:
+        return False
+    log_section["channels"] = channels
+    return True
@@ -1,16 +1,18 @@
 """Reddit link summarizer (optional config: `plugins.reddit`)."""
 
 import asyncio
-import datetime as dt
-import html
 import logging
 import re
+import string
 import textwrap
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,40 @@ URL_PATTERN = re.compile(
     r"https?://(?:www\.|old\.|new\.|np\.|amp\.)?reddit\.com[^\s<>]+|https?://redd\.it/[^\s<>]+",
     re.IGNORECASE,
 )
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Splits "name.attr" / "name[0]" format fields down to the top-level name.
+FIELD_ROOT_PATTERN = re.compile(r"[.\[]")
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+RETRY_TOTAL = 2
+RETRY_BACKOFF_FACTOR = 0.2
+RETRY_STATUS_CODES = (502, 503, 504)
+REDDIT_HOST = "www.reddit.com"
+# Only the post (or the linked comment) is read, so ask Reddit to leave the
+# comment tree out; raw_json=1 also returns text without HTML escaping.
+THREAD_QUERY = "?limit=1&raw_json=1"
+COMMENT_QUERY = "?limit=1&depth=1&raw_json=1"
+USER_QUERY = "?raw_json=1"
+MINUTE_SECS = 60
+HOUR_SECS = 3600
+DAY_SECS = 86400
+FALLBACK_TEMPLATE = "[Reddit] {title}"
+# Replies are combined onto one line only while it stays this short, well
+# under the 512-byte IRC line once the PRIVMSG prefix is added.
+MAX_REPLY_CHARS = 400
+REPLY_SEPARATOR = " || "
+TEMPLATE_FIELDS = frozenset({
+    "title", "subreddit", "url", "author", "name", "created", "age", "points", "score",
+    "comments", "percent", "link_karma", "comment_karma", "extract", "permalink", "domain",
+})
+REDDIT_MAX_CONCURRENT = 4
+
+# Shared so repeated Reddit links reuse keep-alive connections.
+_SESSION: Optional[requests.Session] = None
+# (plugins.reddit section, settings built from it). A config reload
+# swaps in a new section dict, so an identity check is enough.
+_settings_cache: Optional[Tuple[dict, "RedditSettings"]] = None
 
 CONFIG_DEFAULTS = {
     "plugins": {
@@ -46,6 +82,32 @@ class RedditTemplates:
     text_thread: str = "[Reddit] /r/{subreddit} (Self) - {title} | {points} | {age} | {extract}"
     comment: str = "[Reddit] Comment by {author} | {points} | {age} | {extract}"
     user: str = "[Reddit] User: {name} | Karma: {link_karma} / {comment_karma} | {age}"
+    # link type -> (template, field names it references); built once so
+    # rendering only formats the fields a template actually uses.
+    by_type: Dict[str, Tuple[str, FrozenSet[str]]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.by_type = {
+            link_type: (template, _template_fields(template))
+            for link_type, template in (
+                ("link_thread", self.link_thread),
+                ("text_thread", self.text_thread),
+                ("comment", self.comment),
+                ("user", self.user),
+            )
+        }
+
+
+def _template_fields(template: str) -> FrozenSet[str]:
+    """Top-level field names used by a format template; all fields if it will not parse."""
+    try:
+        names = set()
+        for _, field_name, _, _ in string.Formatter().parse(template):
+            if field_name:
+                names.add(FIELD_ROOT_PATTERN.split(field_name, maxsplit=1)[0])
+    except ValueError:
+        return TEMPLATE_FIELDS
+    return frozenset(names)
 
 
 @dataclass
@@ -58,94 +120,160 @@ class RedditSettings:
 
 
 def on_load(bot) -> None:
+    global _settings_cache
+    _settings_cache = None
+    _get_session()
     logger.info("reddit plugin loaded from %s", __file__)
 
 
 def on_unload(bot) -> None:
+    global _SESSION, _settings_cache
+    _settings_cache = None
+    session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
     logger.info("reddit plugin unloaded")
 
 
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = _build_session()
+    return _SESSION
+
+
 def on_message(bot, user: str, channel: str, message: str) -> None:
+    # Substring probe first: almost no line mentions Reddit at all.
+    lowered = message.lower()
+    if "reddit.com" not in lowered and "redd.it" not in lowered:
+        return
     matches = list(_iter_urls(message))
     if not matches:
         return
 
-    loop = asyncio.get_running_loop()
     settings = _settings_from_config(bot)
-    for url in matches[: settings.max_urls_per_message]:
-        loop.create_task(_handle_reddit_url(bot, channel, url, settings))
+    urls = matches[: settings.max_urls_per_message]
+    asyncio.get_running_loop().create_task(_handle_reddit_urls(bot, channel, urls, settings))
 
 
 def _iter_urls(message: str) -> Iterable[str]:
+    # Every match contains "://"; checking that is case-free, unlike "http".
+    if "://" not in message:
+        return
     for match in URL_PATTERN.finditer(message):
         url = match.group(0).rstrip(").,!?")
         yield url
 
 
-async def _handle_reddit_url(bot, channel: str, url: str, settings: RedditSettings) -> None:
-    from core.utils import run_blocking
-    try:
-        reply = await run_blocking(_fetch_and_format_sync, url, settings, timeout=bot.request_timeout)
-    except Exception:
-        logger.exception("Reddit lookup failed for %s", url)
-        return
-
-    if reply:
-        await bot.privmsg(channel, reply)
+async def _handle_reddit_urls(
+    bot, channel: str, urls: List[str], settings: RedditSettings
+) -> None:
+    # Fetch concurrently, then send as few lines as fit, in message order.
+    results = await asyncio.gather(
+        *(_fetch_and_format(url, settings, bot.request_timeout) for url in urls),
+        return_exceptions=True,
+    )
+    replies = []
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            logger.error("Reddit lookup failed for %s", url, exc_info=result)
+        elif result:
+            replies.append(result)
+
+    for line in _pack_replies(replies, MAX_REPLY_CHARS):
+        await bot.privmsg(channel, line)
+
+
+def _pack_replies(replies: List[str], limit: int) -> List[str]:
+    """Join consecutive replies with REPLY_SEPARATOR while the line stays within ``limit``."""
+    lines: List[str] = []
+    for reply in replies:
+        if lines and len(lines[-1]) + len(REPLY_SEPARATOR) + len(reply) <= limit:
+            lines[-1] = f"{lines[-1]}{REPLY_SEPARATOR}{reply}"
+        else:
+            lines.append(reply)
+    return lines
 
 
 def _settings_from_config(bot) -> RedditSettings:
+    global _settings_cache
     from core.utils import get_plugin_config
     section = get_plugin_config(bot, "reddit")
+    if _settings_cache is not None and _settings_cache[0] is section:
+        return _settings_cache[1]
+    settings = _build_settings(section)
+    _settings_cache = (section, settings)
+    return settings
+
+
+# config key -> RedditTemplates field
+TEMPLATE_CONFIG_KEYS = (
+    ("link_thread_template", "link_thread"),
+    ("text_thread_template", "text_thread"),
+    ("comment_template", "comment"),
+    ("user_template", "user"),
+)
+# Integer settings: config key -> smallest accepted value (None for no bound).
+INT_CONFIG_KEYS = (
+    ("max_chars", None),
+    ("timeout", None),
+    ("max_urls_per_message", 1),
+)
 
+
+def _int_setting(raw, default: int, minimum: Optional[int] = None) -> int:
+    """Return ``raw`` as an int (numbers and numeric strings), else ``default``."""
+    if not isinstance(raw, (int, float, str)):
+        return default
+    try:
+        value = int(raw)
+    except (ValueError, OverflowError):
+        return default
+    return value if minimum is None else max(minimum, value)
+
+
+def _build_settings(section: dict) -> RedditSettings:
     defaults = RedditSettings()
 
     template_defaults = defaults.templates
     templates = RedditTemplates(
-        link_thread=str(section.get("link_thread_template", template_defaults.link_thread)),
-        text_thread=str(section.get("text_thread_template", template_defaults.text_thread)),
-        comment=str(section.get("comment_template", template_defaults.comment)),
-        user=str(section.get("user_template", template_defaults.user)),
+        **{
+            name: str(section.get(key, getattr(template_defaults, name)))
+            for key, name in TEMPLATE_CONFIG_KEYS
+        }
     )
-
-    raw_max_chars = section.get("max_chars")
-    max_chars = defaults.max_chars
-    if isinstance(raw_max_chars, int):
-        max_chars = raw_max_chars
-    elif isinstance(raw_max_chars, str):
-        try:
-            max_chars = int(raw_max_chars)
-        except ValueError:
-            max_chars = defaults.max_chars
-
-    user_agent = str(section.get("user_agent", defaults.user_agent))
-
-    raw_timeout = section.get("timeout")
-    timeout = defaults.timeout
-    if isinstance(raw_timeout, int):
-        timeout = raw_timeout
-    elif isinstance(raw_timeout, str):
-        try:
-            timeout = int(raw_timeout)
-        except ValueError:
-            timeout = defaults.timeout
-
-    raw_max_urls = section.get("max_urls_per_message", defaults.max_urls_per_message)
-    try:
-        max_urls = max(1, int(raw_max_urls))
-    except (TypeError, ValueError):
-        max_urls = defaults.max_urls_per_message
+    numbers = {
+        key: _int_setting(section.get(key), getattr(defaults, key), minimum)
+        for key, minimum in INT_CONFIG_KEYS
+    }
 
     return RedditSettings(
-        max_chars=max_chars,
-        user_agent=user_agent,
-        timeout=timeout,
-        max_urls_per_message=max_urls,
+        user_agent=str(section.get("user_agent", defaults.user_agent)),
         templates=templates,
+        **numbers,
     )
 
 
-def _fetch_and_format_sync(url: str, settings: RedditSettings, timeout: int) -> Optional[str]:
+async def _fetch_and_format(url: str, settings: RedditSettings, timeout: int) -> Optional[str]:
+    from core.utils import host_semaphore, json_loads, run_blocking
+
     parsed = _resolve_reddit_url(url)
     if parsed is None:
         return None
@@ -155,7 +283,12 @@ def _fetch_and_format_sync(url: str, settings: RedditSettings, timeout: int) ->
 
     request_timeout = max(1, min(settings.timeout, timeout or settings.timeout))
     try:
-        response = requests.get(api_url, headers=headers, timeout=request_timeout)
+        # Only the request itself goes to a worker thread; parsing and
+        # formatting stay on the loop.
+        async with host_semaphore(REDDIT_HOST, REDDIT_MAX_CONCURRENT):
+            response = await run_blocking(
+                _get_session().get, api_url, headers=headers, timeout=request_timeout
+            )
         response.raise_for_status()
     except requests.RequestException as exc:
         logger.debug("Reddit request failed for %s: %s", api_url, exc)
@@ -164,7 +297,8 @@ def _fetch_and_format_sync(url: str, settings: RedditSettings, timeout: int) ->
         logger.exception("Reddit request unexpected error for %s", api_url)
         return None
     try:
-        payload = response.json()
+        # Parse the raw bytes directly; skips requests' charset detection.
+        payload = json_loads(response.content)
     except ValueError as exc:
         logger.debug("Invalid JSON from Reddit for %s: %s", api_url, exc)
         return None
@@ -172,8 +306,9 @@ def _fetch_and_format_sync(url: str, settings: RedditSettings, timeout: int) ->
     if data is None:
         return None
 
-    fields = _build_template_fields(link_type, data, extract, meta)
-    return _render_template(link_type, fields, settings.templates)
+    template, needed = settings.templates.by_type.get(link_type, (FALLBACK_TEMPLATE, frozenset({"title"})))
+    fields = _build_template_fields(data, extract, meta, needed)
+    return _render_template(link_type, template, fields)
 
 
 def _resolve_reddit_url(url: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
@@ -188,7 +323,7 @@ def _resolve_reddit_url(url: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
         thread = path.strip("/")
         if not thread:
             return None
-        api_url = f"https://www.reddit.com/comments/{thread}.json"
+        api_url = f"https://www.reddit.com/comments/{thread}.json{THREAD_QUERY}"
         return ("thread", api_url, {"permalink": f"/comments/{thread}/"})
 
     segments = [segment for segment in path.split("/") if segment]
@@ -197,14 +332,14 @@ def _resolve_reddit_url(url: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
 
     if segments[0] in {"u", "user"} and len(segments) >= 2:
         user_name = segments[1]
-        api_url = f"https://www.reddit.com/user/{user_name}/about.json"
+        api_url = f"https://www.reddit.com/user/{user_name}/about.json{USER_QUERY}"
         return ("user", api_url, {"name": user_name})
 
     if segments[0] == "comments" and len(segments) >= 1:
         thread_id = segments[1] if len(segments) >= 2 else None
         if not thread_id:
             return None
-        api_url = f"https://www.reddit.com/comments/{thread_id}.json"
+        api_url = f"https://www.reddit.com/comments/{thread_id}.json{THREAD_QUERY}"
         return ("thread", api_url, {"permalink": f"/comments/{thread_id}/"})
 
     if segments[0] == "r" and len(segments) >= 3 and segments[2] == "comments":
@@ -229,6 +364,7 @@ def _resolve_reddit_url(url: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
             slug = slug or "_"
             api_url = (
                 f"https://www.reddit.com/r/{subreddit}/comments/{thread_id}/{slug}/{comment_id}.json"
+                f"{COMMENT_QUERY}"
             )
             return (
                 "comment",
@@ -236,7 +372,7 @@ def _resolve_reddit_url(url: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
                 {"subreddit": subreddit, "thread_id": thread_id, "comment_id": comment_id},
             )
 
-        api_url = f"https://www.reddit.com/r/{subreddit}/comments/{thread_id}.json"
+        api_url = f"https://www.reddit.com/r/{subreddit}/comments/{thread_id}.json{THREAD_QUERY}"
         return ("thread", api_url, {"subreddit": subreddit, "thread_id": thread_id})
 
     return None
@@ -271,8 +407,9 @@ def _prepare_extract(text: str, max_chars: int) -> str:
     if not text:
         return ""
 
-    cleaned = html.unescape(text)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    # raw_json=1 already returns unescaped text; unescaping again would
+    # turn a literal "&amp;" in the post into "&".
+    cleaned = WHITESPACE_PATTERN.sub(" ", text).strip()
 
     if len(cleaned) <= max_chars:
         return cleaned
@@ -286,50 +423,43 @@ def _prepare_extract(text: str, max_chars: int) -> str:
 
 
 def _build_template_fields(
-    link_type: str, data: Mapping[str, Any], extract: str, meta: Dict[str, str]
+    data: Mapping[str, Any], extract: str, meta: Dict[str, str], needed: FrozenSet[str]
 ) -> Dict[str, str]:
-    created_ts = data.get("created_utc")
-    created_text, age_text = _format_age(created_ts)
-
-    score = _coerce_int(data.get("score", 0))
-    num_comments = data.get("num_comments")
-    upvote_ratio = data.get("upvote_ratio")
-
-    fields = {
-        "title": data.get("title", ""),
-        "subreddit": data.get("subreddit", meta.get("subreddit", "")),
-        "url": data.get("url", ""),
-        "author": data.get("author", ""),
-        "name": data.get("name", meta.get("name", "")),
-        "created": created_text,
-        "age": age_text,
-        "points": _format_points(score),
-        "score": _format_number(score),
-        "comments": _format_comments(num_comments),
-        "percent": f"{int(upvote_ratio * 100)}%" if isinstance(upvote_ratio, (float, int)) else "",
-        "link_karma": _format_number(data.get("link_karma")),
-        "comment_karma": _format_number(data.get("comment_karma")),
-        "extract": extract,
-        "permalink": data.get("permalink", meta.get("permalink", "")),
-        "domain": data.get("domain", ""),
-    }
-
-    if link_type == "comment":
-        fields.setdefault("subreddit", meta.get("subreddit", ""))
+    # Title is always filled in; it doubles as the fallback when rendering fails.
+    fields = {"title": data.get("title", "")}
+
+    if "created" in needed or "age" in needed:
+        fields["created"], fields["age"] = _format_age(data.get("created_utc"))
+    if "points" in needed or "score" in needed:
+        score = _coerce_int(data.get("score", 0))
+        fields["points"] = _format_points(score)
+        fields["score"] = _format_number(score)
+    if "comments" in needed:
+        fields["comments"] = _format_comments(data.get("num_comments"))
+    if "percent" in needed:
+        upvote_ratio = data.get("upvote_ratio")
+        fields["percent"] = (
+            f"{int(upvote_ratio * 100)}%" if isinstance(upvote_ratio, (float, int)) else ""
+        )
+    if "link_karma" in needed:
+        fields["link_karma"] = _format_number(data.get("link_karma"))
+    if "comment_karma" in needed:
+        fields["comment_karma"] = _format_number(data.get("comment_karma"))
+    if "extract" in needed:
+        fields["extract"] = extract
+    for name in ("subreddit", "name", "permalink"):
+        if name in needed:
+            fields[name] = data.get(name, meta.get(name, ""))
+    for name in ("url", "author", "domain"):
+        if name in needed:
+            fields[name] = data.get(name, "")
 
     return fields
 
 
-def _render_template(link_type: str, fields: Dict[str, str], templates: RedditTemplates) -> str:
-    template_map = {
-        "link_thread": templates.link_thread,
-        "text_thread": templates.text_thread,
-        "comment": templates.comment,
-        "user": templates.user,
-    }
-    template = template_map.get(link_type, "[Reddit] {title}")
+def _render_template(link_type: str, template: str, fields: Dict[str, str]) -> str:
     try:
-        return template.format(**fields)
+        return template.format_map(fields)
     except Exception:
         logger.exception("Failed to render Reddit template %s", link_type)
         return fields.get("title", "")
@@ -339,32 +469,28 @@ def _format_age(created_utc) -> Tuple[str, str]:
     if not isinstance(created_utc, (int, float)):
         return "", ""
 
-    created = dt.datetime.utcfromtimestamp(created_utc)
-    now = dt.datetime.utcnow()
-    delta = now - created
-
-    if delta.days < 0:
-        return created.strftime("%Y-%m-%d"), ""
+    created_text = time.strftime("%Y-%m-%d", time.gmtime(created_utc))
+    elapsed = int(time.time() - created_utc)
+    if elapsed < 0:
+        return created_text, ""
 
-    if delta.days == 0:
-        if delta.seconds < 60:
+    days, seconds = divmod(elapsed, DAY_SECS)
+    if days == 0:
+        if seconds < MINUTE_SECS:
             age = "just now"
-        elif delta.seconds < 3600:
-            minutes = delta.seconds // 60
-            age = f"{minutes}m ago"
+        elif seconds < HOUR_SECS:
+            age = f"{seconds // MINUTE_SECS}m ago"
         else:
-            hours = delta.seconds // 3600
-            age = f"{hours}h ago"
-    elif delta.days == 1:
+            age = f"{seconds // HOUR_SECS}h ago"
+    elif days == 1:
         age = "yesterday"
-    elif delta.days < 365:
-        age = f"{delta.days}d ago"
+    elif days < 365:
+        age = f"{days}d ago"
     else:
-        years = delta.days // 365
-        days = delta.days % 365
+        years, days = divmod(days, 365)
         age = f"{years}y {days}d ago" if days else f"{years}y ago"
 
-    return created.strftime("%Y-%m-%d"), age
+    return created_text, age
 
 
 def _coerce_int(value: Any) -> int:
@@ -4,20 +4,49 @@ Allows users to set reminders for relative time durations.
 """
 
 import asyncio
-import json
+import heapq
 import logging
+import os
 import re
+import sys
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_STORAGE_NAME = "reminders.json"
+# Reminders live in an append-only JSONL journal. A configured path with any
+# other suffix stores the journal next to it with ".jsonl"; a "<name>.json"
+# file from older versions is migrated into it.
+DEFAULT_STORAGE_NAME = "reminders.jsonl"
 DEFAULT_MAX_PER_USER = 10
 MAX_DURATION_SECONDS = 365 * 24 * 60 * 60 * 2  # 2 years limit
+SAVE_DELAY_SECS = 0.5
+# The journal is rewritten from the live set once it holds this many times
+# more records than there are reminders (and at least COMPACT_MIN_RECORDS).
+COMPACT_FACTOR = 4
+COMPACT_MIN_RECORDS = 64
+
+DURATION_PATTERN = re.compile(r"(\d+)\s*([a-zA-Z]+)")
+UNIT_SECONDS = {
+    "s": 1, "sec": 1, "seconds": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400,
+    "w": 604800, "week": 604800, "weeks": 604800,
+    "mo": 2628000, "month": 2628000, "months": 2628000,  # Approx 30.4 days
+    "y": 31536000, "year": 31536000, "years": 31536000,  # 365 days
+}
+
+# Serialises writers of the reminders file (debounced saves run in the
+# default executor, the final save on unload runs on the caller's thread).
+_write_lock = threading.Lock()
+# Bumped by every journal rewrite; an append queued before a rewrite is
+# already contained in it and must not be written after it.
+_journal_generation = 0
 
 CONFIG_DEFAULTS = {
     "plugins": {
@@ -31,7 +60,11 @@ CONFIG_DEFAULTS = {
 }
 
 
-@dataclass
+# Reminders are the one per-record type here; slots keep them small where supported.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class Reminder:
     user: str
     channel: str
@@ -59,7 +92,7 @@ class Reminder:
                 message=str(data["message"]),
                 created_at=float(data["created_at"]),
                 trigger_at=float(data["trigger_at"]),
-                id=str(data.get("id", str(time.time_ns()))),
+                id=str(data.get("id") or time.time_ns()),
             )
         except (KeyError, TypeError, ValueError):
             return None
@@ -74,13 +107,34 @@ class ReminderSettings:
     triggers: List[str] = field(
         default_factory=lambda: list(CONFIG_DEFAULTS["plugins"]["remindme"]["triggers"])
     )
+    # Lowercased, interned copy of ``triggers`` for the per-message lookup.
+    trigger_set: FrozenSet[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.trigger_set = frozenset(sys.intern(t.lower()) for t in self.triggers)
 
 
 @dataclass
 class PluginState:
     settings: ReminderSettings
-    reminders: List[Reminder] = field(default_factory=list)
-    active_tasks: Dict[str, asyncio.Task] = field(default_factory=dict)
+    # Keyed by Reminder.id; go through _add_reminder/_remove_reminder so
+    # per_user_counts stays in step.
+    reminders: Dict[str, Reminder] = field(default_factory=dict)
+    per_user_counts: Dict[str, int] = field(default_factory=dict)
+    # (due on the loop's monotonic clock, trigger_at, reminder id) for every
+    # scheduled reminder; entries whose reminder has gone are skipped when
+    # they reach the top.
+    heap: List[Tuple[float, float, str]] = field(default_factory=list)
+    _wakeup: Optional[asyncio.Event] = None
+    _dispatcher: Optional[asyncio.Task] = None
+    _save_handle: Optional[asyncio.TimerHandle] = None
+    _save_task: Optional[asyncio.Future] = None
+    # Encoded journal lines not yet appended, and records already in the file.
+    _pending_lines: List[bytes] = field(default_factory=list)
+    _journal_records: int = 0
+    # False when the stored reminders could not all be read on load; the
+    # files are then only appended to, never rewritten or removed.
+    _rewrite_ok: bool = True
 
 
 state: Optional[PluginState] = None
@@ -89,8 +143,18 @@ state: Optional[PluginState] = None
 def on_load(bot) -> None:
     global state
     settings = _settings_from_config(bot)
-    reminders = _load_reminders(settings.storage_path)
-    state = PluginState(settings=settings, reminders=reminders)
+    reminders, complete = _load_reminders(settings.storage_path)
+    state = PluginState(settings=settings, _rewrite_ok=complete)
+    for reminder in reminders:
+        _add_reminder(reminder)
+    if complete:
+        # Start each run from a compact journal (this also migrates the old JSON file).
+        _save_reminders()
+    else:
+        logger.warning(
+            "Some stored reminders could not be read; leaving %s untouched and only appending",
+            _journal_path(settings.storage_path),
+        )
     
     _schedule_loaded_reminders(bot)
     
@@ -99,16 +163,18 @@ def on_load(bot) -> None:
         "Remindme plugin loaded. Storage: %s. Triggers: %s. Active reminders: %d",
         settings.storage_path,
         triggers,
-        len(reminders),
+        len(state.reminders),
     )
 
 
 def on_unload(bot) -> None:
     global state
     if state:
-        for task in state.active_tasks.values():
-            if not task.done():
-                task.cancel()
+        if state._dispatcher is not None and not state._dispatcher.done():
+            state._dispatcher.cancel()
+        if state._save_handle is not None:
+            state._save_handle.cancel()
+            state._save_handle = None
         _save_reminders()
         state = None
     logger.info("Remindme plugin unloaded")
@@ -128,7 +194,7 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
         return
 
     trigger = parts[0].lower()
-    if trigger not in state.settings.triggers:
+    if trigger not in state.settings.trigger_set:
         return
 
     if len(parts) < 3:
@@ -176,8 +242,7 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
         return
 
     nick = user.split("!", 1)[0]
-    user_reminders = [r for r in state.reminders if r.user == nick]
-    if len(user_reminders) >= state.settings.max_reminders_per_user:
+    if state.per_user_counts.get(nick, 0) >= state.settings.max_reminders_per_user:
         asyncio.create_task(bot.privmsg(channel, f"You have reached the limit of {state.settings.max_reminders_per_user} active reminders."))
         return
 
@@ -192,8 +257,8 @@ def on_message(bot, user: str, channel: str, message: str) -> None:
         trigger_at=trigger_at
     )
     
-    state.reminders.append(reminder)
-    _save_reminders()
+    _add_reminder(reminder)
+    _journal(reminder.to_dict())
     _schedule_reminder(bot, reminder)
 
     readable_time = _format_delta(delta)
@@ -204,43 +269,79 @@ def _schedule_loaded_reminders(bot):
     if not state:
         return
     
-    now = time.time()
-    # Sort so we process overdue first? Order doesn't matter much for async scheduling
-    for reminder in state.reminders:
+    for reminder in state.reminders.values():
         _schedule_reminder(bot, reminder)
 
 
+def _add_reminder(reminder: Reminder) -> None:
+    previous = state.reminders.get(reminder.id)
+    if previous is not None:
+        _remove_reminder(previous)
+    state.reminders[reminder.id] = reminder
+    state.per_user_counts[reminder.user] = state.per_user_counts.get(reminder.user, 0) + 1
+
+
+def _remove_reminder(reminder: Reminder) -> bool:
+    if state.reminders.pop(reminder.id, None) is None:
+        return False
+    remaining = state.per_user_counts.get(reminder.user, 0) - 1
+    if remaining > 0:
+        state.per_user_counts[reminder.user] = remaining
+    else:
+        state.per_user_counts.pop(reminder.user, None)
+    return True
+
+
 def _schedule_reminder(bot, reminder: Reminder):
     if not state:
         return
 
-    # Cancel existing task if any (shouldn't happen usually unless re-scheduling)
-    if reminder.id in state.active_tasks:
-        state.active_tasks[reminder.id].cancel()
-
-    task = asyncio.create_task(_reminder_coro(bot, reminder))
-    state.active_tasks[reminder.id] = task
-    task.add_done_callback(lambda t: _cleanup_task(reminder.id))
-
+    # trigger_at is wall-clock so it survives restarts; convert it once to the
+    # loop's monotonic clock so later wall-clock jumps do not move the timer.
+    loop = asyncio.get_running_loop()
+    due = loop.time() + (reminder.trigger_at - time.time())
+    heapq.heappush(state.heap, (due, reminder.trigger_at, reminder.id))
+    if state._wakeup is None:
+        state._wakeup = asyncio.Event()
+    if state._dispatcher is None or state._dispatcher.done():
+        state._dispatcher = asyncio.create_task(_dispatch_reminders(bot, state))
+    # Let the dispatcher re-check in case this one is due sooner.
+    state._wakeup.set()
+
+
+async def _dispatch_reminders(bot, plugin_state: PluginState) -> None:
+    """Single timer for all reminders: sleep until the earliest is due, fire, repeat."""
+    loop = asyncio.get_running_loop()
+    heap = plugin_state.heap
+    wakeup = plugin_state._wakeup
+    while True:
+        while heap and heap[0][2] not in plugin_state.reminders:
+            heapq.heappop(heap)
+
+        if not heap:
+            await wakeup.wait()
+            wakeup.clear()
+            continue
 
-def _cleanup_task(reminder_id: str):
-    if state and reminder_id in state.active_tasks:
-        del state.active_tasks[reminder_id]
+        delay = heap[0][0] - loop.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            continue
 
+        _, trigger_at, reminder_id = heapq.heappop(heap)
+        reminder = plugin_state.reminders.get(reminder_id)
+        if reminder is not None and reminder.trigger_at == trigger_at:
+            asyncio.create_task(_fire_reminder(bot, reminder))
 
-async def _reminder_coro(bot, reminder: Reminder):
-    delay = reminder.trigger_at - time.time()
-    if delay > 0:
-        try:
-            await asyncio.sleep(delay)
-        except asyncio.CancelledError:
-            return
 
-    # Fire reminder
+async def _fire_reminder(bot, reminder: Reminder):
     if state:
-        if reminder in state.reminders:
-            state.reminders.remove(reminder)
-            _save_reminders()
+        if _remove_reminder(reminder):
+            _journal({"id": reminder.id, "deleted": True})
 
     # If it's very old, maybe add a note?
     # For now just send it.
@@ -255,42 +356,25 @@ async def _reminder_coro(bot, reminder: Reminder):
 
 def _parse_duration(s: str) -> Optional[timedelta]:
     """Parse duration string like 1h30m, 1d, 1y."""
-    # Units map
-    units = {
-        "s": 1, "sec": 1, "seconds": 1, "second": 1,
-        "m": 60, "min": 60, "minute": 60, "minutes": 60,
-        "h": 3600, "hour": 3600, "hours": 3600,
-        "d": 86400, "day": 86400, "days": 86400,
-        "w": 604800, "week": 604800, "weeks": 604800,
-        "mo": 2628000, "month": 2628000, "months": 2628000, # Approx 30.4 days
-        "y": 31536000, "year": 31536000, "years": 31536000, # 365 days
-    }
-    
-    # Simple regex to find pairs of number + unit
-    # Matches "1h", "30m", "10 s" (optional space? let's stick to user request "1sec/1min...")
-    # User request example: "1sec/1min/1h/1d/1m/1y and so (for example 43min or 2w)"
-    
-    pattern = re.compile(r"(\d+)\s*([a-zA-Z]+)")
-    matches = pattern.findall(s)
-    
+    # Matches "1h", "30m", "10 s"
+    matches = DURATION_PATTERN.findall(s)
     if not matches:
         return None
-        
+
     total_seconds = 0
     found_any = False
-    
+
     for amount_str, unit_str in matches:
-        unit = unit_str.lower()
-        if unit not in units:
+        unit_seconds = UNIT_SECONDS.get(unit_str.lower())
+        if unit_seconds is None:
             continue
-            
-        amount = int(amount_str)
-        total_seconds += amount * units[unit]
+
+        total_seconds += int(amount_str) * unit_seconds
         found_any = True
-        
+
     if not found_any:
         return None
-        
+
     return timedelta(seconds=total_seconds)
 
 
@@ -322,7 +406,11 @@ def _settings_from_config(bot) -> ReminderSettings:
     else:
         storage_path = default_path
         
-    max_reminders = settings.get("max_reminders_per_user", DEFAULT_MAX_PER_USER)
+    raw_max = settings.get("max_reminders_per_user", DEFAULT_MAX_PER_USER)
+    try:
+        max_reminders = max(1, int(raw_max))
+    except (TypeError, ValueError):
+        max_reminders = DEFAULT_MAX_PER_USER
     
     conf_triggers = settings.get("triggers")
     if isinstance(conf_triggers, list):
@@ -337,32 +425,184 @@ def _settings_from_config(bot) -> ReminderSettings:
     )
 
 
-def _load_reminders(path: Path) -> List[Reminder]:
-    from core.utils import load_json
+def _journal_path(storage_path: Path) -> Path:
+    return storage_path.with_suffix(".jsonl")
+
 
-    data = load_json(path, default=[])
-    if not isinstance(data, list):
-        return []
+def _legacy_path(storage_path: Path) -> Path:
+    """Where versions before the journal kept the reminders as one JSON array."""
+    if storage_path.suffix == ".jsonl":
+        return storage_path.with_suffix(".json")
+    return storage_path
 
-    loaded = []
-    for item in data:
+
+def _load_reminders(path: Path) -> Tuple[List[Reminder], bool]:
+    """Read the older JSON array file, if still present, then replay the journal over it.
+
+    The flag is False if anything could not be read, so callers know not to
+    rewrite or remove the files.
+    """
+    from core.utils import json_loads
+
+    records: Dict[str, Reminder] = {}
+    complete = True
+
+    legacy_path = _legacy_path(path)
+    if legacy_path.exists():
+        try:
+            data = json_loads(legacy_path.read_bytes())
+        except (OSError, ValueError):
+            logger.warning("Failed to read reminders from %s", legacy_path, exc_info=True)
+            data = None
+        if isinstance(data, list):
+            for item in data:
+                r = Reminder.from_dict(item) if isinstance(item, dict) else None
+                if r:
+                    records[r.id] = r
+        else:
+            complete = False
+
+    journal_path = _journal_path(path)
+    if not journal_path.exists():
+        return list(records.values()), complete
+    try:
+        lines = journal_path.read_bytes().splitlines()
+    except OSError:
+        logger.warning("Failed to read reminders from %s", journal_path, exc_info=True)
+        return list(records.values()), False
+
+    last = len(lines) - 1
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            item = json_loads(line)
+        except ValueError:
+            # A torn last line is what a crash mid-append leaves behind;
+            # anything earlier means the file is damaged.
+            if index != last:
+                logger.warning("Malformed line %d in %s", index + 1, journal_path)
+                complete = False
+            continue
+        if not isinstance(item, dict):
+            continue
+        if item.get("deleted"):
+            records.pop(str(item.get("id")), None)
+            continue
         r = Reminder.from_dict(item)
         if r:
-            loaded.append(r)
-    return loaded
+            records[r.id] = r
+    return list(records.values()), complete
+
+
+def _journal(record: Dict[str, Any]) -> None:
+    """Queue one journal line (a reminder, or an id tombstone) for the next save."""
+    if not state:
+        return
+    from core.utils import json_dumps
+
+    state._pending_lines.append(json_dumps(record) + b"\n")
+    _schedule_save()
+
+
+def _schedule_save() -> None:
+    """Coalesce saves made within SAVE_DELAY_SECS into one off-loop write."""
+    if not state:
+        return
+    if state._save_handle is not None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _save_reminders()
+        return
+    state._save_handle = loop.call_later(SAVE_DELAY_SECS, _start_save)
+
+
+def _start_save() -> None:
+    if not state:
+        return
+    state._save_handle = None
+    loop = asyncio.get_running_loop()
+    if state._save_task is not None and not state._save_task.done():
+        # Previous write still running; try again once it has had time to finish.
+        state._save_handle = loop.call_later(SAVE_DELAY_SECS, _start_save)
+        return
+
+    journal_path = _journal_path(state.settings.storage_path)
+    lines, state._pending_lines = state._pending_lines, []
+    records = state._journal_records + len(lines)
+    if state._rewrite_ok and records > max(COMPACT_MIN_RECORDS, COMPACT_FACTOR * len(state.reminders)):
+        data = [r.to_dict() for r in state.reminders.values()]
+        state._journal_records = len(data)
+        state._save_task = loop.run_in_executor(None, _rewrite_journal, journal_path, data)
+    elif lines:
+        state._journal_records = records
+        state._save_task = loop.run_in_executor(
+            None, _append_journal, journal_path, lines, _journal_generation
+        )
 
 
 def _save_reminders() -> None:
+    """Synchronously rewrite the journal from the live reminders.
+
+    After an incomplete load only the pending lines are appended.
+    """
     if not state:
         return
-        
+    if not state._rewrite_ok:
+        lines, state._pending_lines = state._pending_lines, []
+        if lines:
+            _append_journal(_journal_path(state.settings.storage_path), lines, _journal_generation)
+        return
+    data = [r.to_dict() for r in state.reminders.values()]
+    state._pending_lines = []
+    state._journal_records = len(data)
+    if not _rewrite_journal(_journal_path(state.settings.storage_path), data):
+        return
+
+    legacy_path = _legacy_path(state.settings.storage_path)
+    if legacy_path.exists():
+        try:
+            legacy_path.unlink()
+        except OSError:
+            logger.warning("Failed to remove migrated %s", legacy_path, exc_info=True)
+
+
+def _append_journal(path: Path, lines: List[bytes], generation: int) -> None:
+    try:
+        with _write_lock:
+            if generation != _journal_generation:
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, b"".join(lines))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    except Exception:
+        logger.error("Failed to save reminders", exc_info=True)
+
+
+def _rewrite_journal(path: Path, data: List[Dict[str, Any]]) -> bool:
+    global _journal_generation
+    from core.utils import json_dumps
+
     try:
-        from core.utils import atomic_write_json
-        path = state.settings.storage_path
-        data = [r.to_dict() for r in state.reminders]
-        atomic_write_json(path, data, indent=2)
+        with _write_lock:
+            _journal_generation += 1
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            with tmp_path.open("wb") as handle:
+                handle.write(b"".join(json_dumps(item) + b"\n" for item in data))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, path)
+        return True
     except Exception:
         logger.error("Failed to save reminders", exc_info=True)
+        return False
 
 
 def _parse_absolute(at_content: str) -> Tuple[Optional[timedelta], str, Optional[str]]:
@@ -378,13 +618,34 @@ def _parse_absolute(at_content: str) -> Tuple[Optional[timedelta], str, Optional
     time_str = parts[1]
     reminder_msg = parts[2] if len(parts) > 2 else "Reminder"
     
-    dt_str = f"{date_str} {time_str}"
-    try:
-        target_dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-    except ValueError:
+    target_dt = _parse_datetime(date_str, time_str)
+    if target_dt is None:
         return None, "", "correct format is YYYY-MM-DD HH:MM"
         
     now_dt = datetime.now()
     delta = target_dt - now_dt
     
     return delta, reminder_msg, None
+
+
+def _parse_datetime(date_str: str, time_str: str) -> Optional[datetime]:
+    """Parse 'YYYY-MM-DD' and 'HH:MM' by hand; strptime is slow for one fixed format.
+
+    Accepts the same inputs as strptime's "%Y-%m-%d %H:%M", including
+    single-digit month, day, hour and minute.
+    """
+    date_parts = date_str.split("-")
+    time_parts = time_str.split(":")
+    if len(date_parts) != 3 or len(time_parts) != 2:
+        return None
+    if len(date_parts[0]) != 4:
+        return None
+    numbers = []
+    for index, part in enumerate(date_parts + time_parts):
+        if not (part.isascii() and part.isdigit()) or (index and len(part) > 2):
+            return None
+        numbers.append(int(part))
+    try:
+        return datetime(*numbers)
+    except ValueError:
+        return None
@@ -1,7 +1,6 @@
 """Track when users were last seen and respond to `.seen <nick>`."""
 
 import asyncio
-import json
 import logging
 import time
 from dataclasses import dataclass, field
@@ -11,12 +10,14 @@ from typing import Any, Dict, List, Optional
 logger = logging.getLogger(__name__)
 
 DEFAULT_STORAGE_NAME = "seen_users.json"
+DEFAULT_FLUSH_INTERVAL_SECS = 5.0
 
 CONFIG_DEFAULTS = {
     "plugins": {
         "seen": {
             "enabled": True,
             "storage_path": DEFAULT_STORAGE_NAME,
+            "flush_interval_secs": DEFAULT_FLUSH_INTERVAL_SECS,
         }
     }
 }
@@ -58,12 +59,16 @@ class SeenSettings:
     storage_path: Path = field(
         default_factory=lambda: Path(__file__).resolve().parent / DEFAULT_STORAGE_NAME
     )
+    # Updates are written at most this often; 0 writes on every update.
+    flush_interval_secs: float = DEFAULT_FLUSH_INTERVAL_SECS
 
 
 @dataclass
 class SeenState:
     settings: SeenSettings
     entries: Dict[str, Dict[str, SeenEntry]] = field(default_factory=dict)
+    dirty: bool = False
+    _flush_task: Optional[asyncio.Task] = None
 
 
 state: Optional[SeenState] = None
@@ -91,7 +96,9 @@ def on_load(bot) -> None:
 def on_unload(bot) -> None:
     global state
     try:
-        _persist_entries()
+        if state is not None and state._flush_task is not None:
+            state._flush_task.cancel()
+        _flush_entries()
     finally:
         state = None
     logger.info("seen plugin unloaded")
@@ -201,6 +208,39 @@ def _record_seen(nick: str, user_mask: str, channel: str, event: str) -> None:
 
     bucket = state.entries.setdefault(nick_key, {})
     bucket[channel_key] = entry
+    state.dirty = True
+    _schedule_flush()
+
+
+def _schedule_flush() -> None:
+    """Make sure pending updates get written by the flush loop."""
+    assert state is not None
+    if state._flush_task is not None and not state._flush_task.done():
+        return
+    if state.settings.flush_interval_secs <= 0:
+        _flush_entries()
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _flush_entries()
+        return
+    state._flush_task = loop.create_task(_flush_loop(state))
+
+
+async def _flush_loop(owner: SeenState) -> None:
+    # Bound to the state it was started for so a reload cannot leave it
+    # writing on behalf of a newer one.
+    while state is owner:
+        await asyncio.sleep(owner.settings.flush_interval_secs)
+        if state is owner:
+            _flush_entries()
+
+
+def _flush_entries() -> None:
+    if state is None or not state.dirty:
+        return
+    state.dirty = False
     _persist_entries()
 
 
@@ -279,16 +319,23 @@ def _settings_from_config(bot) -> SeenSettings:
         else:
             storage_path = candidate_path
 
-    return SeenSettings(storage_path=storage_path)
+    default_interval = CONFIG_DEFAULTS["plugins"]["seen"]["flush_interval_secs"]
+    try:
+        flush_interval = max(0.0, float(section.get("flush_interval_secs", default_interval)))
+    except (TypeError, ValueError):
+        flush_interval = float(default_interval)
+
+    return SeenSettings(storage_path=storage_path, flush_interval_secs=flush_interval)
 
 
 def _load_entries(path: Path) -> Dict[str, Dict[str, SeenEntry]]:
     if not path.exists():
         return {}
 
+    from core.utils import json_loads
+
     try:
-        with path.open("r", encoding="utf-8") as handle:
-            payload = json.load(handle)
+        payload = json_loads(path.read_bytes())
     except Exception:
         logger.warning("Failed to load seen data from %s", path, exc_info=True)
         return {}
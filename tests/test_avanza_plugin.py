@@ -0,0 +1,33 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.avanza as avanza
+
+
+class TestQuoteCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        avanza._result_cache.clear()
+        avanza._obid_cache.clear()
+
+    async def test_failed_lookups_are_not_cached(self):
+        bot = MagicMock()
+        bot.request_timeout = 5
+        bot.privmsg = AsyncMock()
+        hit = {"title": "Acme"}
+        with patch.object(avanza, "_search_stock", return_value=(1, hit)) as search, \
+                patch.object(avanza, "_fetch_latest_close", side_effect=[None, 12.5]):
+            await avanza._handle_avanza(bot, "#c", "acme")
+            await avanza._handle_avanza(bot, "#c", "acme")
+
+        replies = [call.args[1] for call in bot.privmsg.await_args_list]
+        self.assertEqual(replies[0], "No OHLC data found.")
+        self.assertTrue(replies[1].startswith("Acme - Price: 12.5"))
+        search.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import core.utils as utils
+import scripts.chatgpt as chatgpt
+
+
+def _event(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, pieces):
+        self._pieces = list(pieces)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._pieces:
+            raise StopAsyncIteration
+        return _event(self._pieces.pop(0))
+
+    async def close(self):
+        self.closed = True
+
+
+class TestCallOpenAI(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        utils._host_semaphores.pop("api.openai.com", None)
+        self.stream = FakeStream(["one two ", "three four ", "five"])
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=self.stream)
+        settings = chatgpt.ChatGPTSettings(api_key="k", max_message_length=8, enabled=True)
+        chatgpt.state = chatgpt.ChatGPTState(settings=settings, client=client)
+        self.settings = settings
+
+    async def asyncTearDown(self):
+        chatgpt.state = None
+
+    async def test_api_slot_is_released_before_lines_are_sent(self):
+        chunks = chatgpt._call_openai([], self.settings)
+        first = await chunks.__anext__()
+        await asyncio.sleep(0)
+
+        semaphore = utils.host_semaphore("api.openai.com", chatgpt.OPENAI_MAX_CONCURRENT)
+        self.assertEqual(semaphore._value, chatgpt.OPENAI_MAX_CONCURRENT)
+        self.assertTrue(self.stream.closed)
+        rest = [chunk async for chunk in chunks]
+        self.assertEqual(" ".join([first, *rest]), "one two three four five")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from core.utils import validate_config
+from core.utils import build_validator, validate_config
 
 class TestConfigValidation(unittest.TestCase):
     def test_valid_config(self):
@@ -53,5 +53,15 @@ class TestConfigValidation(unittest.TestCase):
         with self.assertRaisesRegex(TypeError, "Config key 'use_tls' must be of type bool"):
             validate_config(config)
 
+    def test_build_validator_is_cached(self):
+        required = {"name": str, "count": int}
+        validator = build_validator(required)
+        self.assertIs(validator, build_validator(dict(required)))
+        validator({"name": "x", "count": 1})
+        with self.assertRaisesRegex(KeyError, "count"):
+            validator({"name": "x"})
+        with self.assertRaisesRegex(TypeError, "'count' must be of type int"):
+            validator({"name": "x", "count": "1"})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,209 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.extract_url as extract_url
+from scripts.extract_url import _MetadataStream, _fetch_html_with_limits_sync, _iter_urls
+
+PAGE = (
+    "<html><head><title>Hej &amp; då</title>"
+    '<meta property="og:title" content="OG titel">'
+    '<meta name="Description" content="En beskrivning">'
+    "</head><body><p>text</p></body></html>"
+).encode("utf-8")
+
+
+class TestIterUrls(unittest.TestCase):
+    def test_trailing_punctuation_is_not_captured(self):
+        message = "(see http://example.com/a.b). and https://example.org/x?y=1!"
+        self.assertEqual(
+            list(_iter_urls(message)),
+            ["http://example.com/a.b", "https://example.org/x?y=1"],
+        )
+
+
+def _stream_metadata(body, chunk_size=16):
+    # Feeds the body in small chunks, as the fetch loop does.
+    stream = _MetadataStream(extract_url._sniff_charset(body))
+    for start in range(0, len(body), chunk_size):
+        stream.feed(body[start:start + chunk_size])
+    return stream.close()
+
+
+class TestExtractMetadata(unittest.TestCase):
+    expected = {"title": "Hej & då", "og:title": "OG titel", "description": "En beskrivning"}
+
+    def test_extracts_title_and_meta(self):
+        self.assertEqual(_stream_metadata(PAGE), self.expected)
+
+    def test_stdlib_fallback_matches(self):
+        with patch.object(extract_url, "etree", None):
+            self.assertEqual(_stream_metadata(PAGE), self.expected)
+            self.assertEqual(_stream_metadata(PAGE, chunk_size=len(PAGE)), self.expected)
+
+    def test_head_scan_handles_loose_attributes(self):
+        head = b"<head><meta property=og:title content='A &amp; B'><title> T </title></head>"
+        self.assertEqual(
+            extract_url._scan_head_metadata(head, "utf-8"),
+            {"og:title": "A & B", "title": "T"},
+        )
+        self.assertIsNone(extract_url._scan_head_metadata(b"<head><title>T</title>", "utf-8"))
+
+    def test_head_scan_reads_quoted_angle_brackets(self):
+        head = b'<head><meta name="description" content="a > b"></head>'
+        self.assertEqual(extract_url._scan_head_metadata(head, "utf-8"), {"description": "a > b"})
+
+    def test_head_scan_defers_comments_and_scripts(self):
+        for head in (
+            b'<head><!-- <meta name="description" content="old"> --></head>',
+            b'<head><script>x = \'<meta name="description" content="js">\'</script></head>',
+        ):
+            self.assertIsNone(extract_url._scan_head_metadata(head, "utf-8"))
+
+    def test_whole_head_in_first_chunk_skips_both_parsers(self):
+        for backend in (extract_url.etree, None):
+            with patch.object(extract_url, "etree", backend):
+                stream = _MetadataStream("utf-8")
+                stream.feed(PAGE)
+                self.assertTrue(stream.done)
+                self.assertIsNotNone(stream._fast_meta)
+                self.assertEqual(stream.close(), self.expected)
+
+    def test_meta_charset_is_honoured(self):
+        body = '<head><meta charset="iso-8859-1"><title>åäö</title></head>'.encode("latin-1")
+        self.assertEqual(_stream_metadata(body), {"title": "åäö"})
+
+
+class TestPublicHostCache(unittest.TestCase):
+    def setUp(self):
+        extract_url._public_host_cache.clear()
+
+    def test_resolves_each_host_once(self):
+        infos = [(extract_url.socket.AF_INET, None, None, None, ("93.184.216.34", 0))]
+        with patch.object(extract_url.socket, "getaddrinfo", return_value=infos) as resolve:
+            self.assertTrue(extract_url._is_public_host("example.com"))
+            self.assertTrue(extract_url._is_public_host("EXAMPLE.com"))
+        resolve.assert_called_once()
+
+    def test_trusted_suffixes_skip_dns(self):
+        with patch.object(extract_url.socket, "getaddrinfo") as resolve:
+            self.assertTrue(extract_url._is_public_host("en.wikipedia.org"))
+            self.assertTrue(extract_url._is_public_host("github.com"))
+        resolve.assert_not_called()
+        self.assertFalse(extract_url._is_trusted_host("github.com.evil.example"))
+        self.assertFalse(extract_url._is_trusted_host("notgithub.com"))
+
+    def test_resolution_failures_are_not_cached(self):
+        with patch.object(extract_url.socket, "getaddrinfo", side_effect=extract_url.socket.gaierror):
+            self.assertFalse(extract_url._is_public_host("flaky.example"))
+        self.assertNotIn("flaky.example", extract_url._public_host_cache)
+
+
+class TestPublicHostAsync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        extract_url._public_host_cache.clear()
+
+    async def test_async_check_warms_sync_cache(self):
+        infos = [(extract_url.socket.AF_INET, None, None, None, ("10.0.0.5", 0))]
+        with patch.object(extract_url.socket, "getaddrinfo", return_value=infos) as resolve:
+            self.assertIsNone(await extract_url._validate_url_async("http://intranet.example/"))
+            self.assertIsNone(extract_url._validate_url("http://intranet.example/"))
+        resolve.assert_called_once()
+
+
+class TestRecentPreviews(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        extract_url._recent.clear()
+        extract_url._inflight.clear()
+
+    async def test_repeat_urls_share_one_fetch(self):
+        settings = extract_url.ExtractSettings()
+        with patch.object(extract_url, "_validate_url_async", return_value="https://example.com/"), \
+                patch.object(extract_url, "_fetch_and_format_sync", return_value="Example (example.com)") as fetch:
+            first, second = await asyncio.gather(
+                extract_url._preview_for("https://example.com/", settings, 5),
+                extract_url._preview_for("https://example.com/", settings, 5),
+            )
+            third = await extract_url._preview_for("https://example.com/", settings, 5)
+
+        self.assertEqual({first, second, third}, {"Example (example.com)"})
+        fetch.assert_called_once()
+
+
+class TestFetchHtml(unittest.TestCase):
+    def _session_for(self, chunks):
+        response = MagicMock()
+        response.is_redirect = False
+        response.is_permanent_redirect = False
+        response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        response.encoding = "utf-8"
+        served = []
+
+        def read(amt, decode_content):
+            index = len(served)
+            if index >= len(chunks):
+                return b""
+            served.append(chunks[index][:amt])
+            return served[-1]
+
+        response.raw.read.side_effect = read
+        session = MagicMock()
+        session.get.return_value = response
+        return session, served
+
+    def test_stops_reading_after_head(self):
+        chunks = [PAGE[:40], PAGE[40:], b"<p>" + b"x" * 8192] + [b"y" * 8192] * 10
+        session, served = self._session_for(chunks)
+        for backend in (extract_url.etree, None):
+            served.clear()
+            with patch.object(extract_url, "etree", backend):
+                data, final_url = _fetch_html_with_limits_sync(
+                    session,
+                    "https://example.com/",
+                    headers={},
+                    connect_timeout=1,
+                    request_timeout=1,
+                )
+
+            self.assertEqual(len(served), 2)
+            self.assertEqual(data["og:title"], "OG titel")
+            self.assertEqual(final_url, "https://example.com/")
+
+    def test_read_stops_at_cap(self):
+        chunks = [b"<html><head><script>"] + [b"x" * 8192] * 100
+        session, served = self._session_for(chunks)
+        with patch.object(extract_url, "MAX_CONTENT_BYTES", 20_000):
+            data, final_url = _fetch_html_with_limits_sync(
+                session,
+                "https://example.com/",
+                headers={},
+                connect_timeout=1,
+                request_timeout=1,
+            )
+
+        self.assertIsNone(data)
+        self.assertEqual(sum(len(chunk) for chunk in served), 20_001)
+
+    def test_body_of_exactly_the_cap_is_kept(self):
+        # Nothing ends the head, so the whole body is read before the stream closes.
+        body = b"<html><title>Kort</title>"
+        session, served = self._session_for([body])
+        with patch.object(extract_url, "MAX_CONTENT_BYTES", len(body)):
+            data, final_url = _fetch_html_with_limits_sync(
+                session,
+                "https://example.com/",
+                headers={},
+                connect_timeout=1,
+                request_timeout=1,
+            )
+
+        self.assertEqual(data, {"title": "Kort"})
+        self.assertEqual(final_url, "https://example.com/")
+
+
+if __name__ == "__main__":
+    unittest.main()
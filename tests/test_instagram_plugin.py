@@ -0,0 +1,70 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.instagram as instagram
+from scripts.instagram import _extract_path_and_shortcode, _parse_caption, _parse_embed_html, _strip_tags
+
+
+class TestInstagramParsing(unittest.TestCase):
+    def test_strip_tags_keeps_line_breaks(self):
+        self.assertEqual(_strip_tags('<a href="/x">nasa</a> hi<br/>there<BR >!'), "nasa hi\nthere\n!")
+        self.assertEqual(_strip_tags("a < b and 3>2"), "a 2")
+        self.assertEqual(_strip_tags("tail <b"), "tail <b")
+
+    def test_caption_drops_comment_footer(self):
+        source = '<div class="Caption"><a>nasa</a> Moon &amp; stars View all 12 comments</div>'
+        self.assertEqual(_parse_caption(source), "nasa Moon & stars")
+
+    def test_embed_fields(self):
+        source = (
+            '<a class="CaptionUsername" href="/nasa/">nasa</a>"is_verified":true'
+            "<span>>1.2k likes<</span>"
+        )
+        result = _parse_embed_html(source)
+        self.assertEqual(result.username, "nasa")
+        self.assertTrue(result.is_verified)
+        self.assertEqual(result.likes, 1200)
+
+    def test_shortcode_extraction(self):
+        self.assertEqual(_extract_path_and_shortcode("https://instagram.com/REELS/AbC_1?igsh=x"), ("reels", "AbC_1"))
+        self.assertEqual(_extract_path_and_shortcode("https://www.instagram.com/p/xyz/"), ("p", "xyz"))
+        self.assertEqual(_extract_path_and_shortcode("https://www.instagram.com/nasa/"), (None, None))
+
+
+class TestSummaryCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        instagram._summary_cache.clear()
+
+    async def test_reel_aliases_share_one_fetch(self):
+        settings = instagram.InstagramSettings()
+        result = instagram.InstagramResult("nasa", False, 10, None)
+        with patch.object(instagram, "_fetch_instagram_data", return_value=result) as fetch:
+            first = await instagram._fetch_and_format("https://www.instagram.com/reel/abc/", settings, 5)
+            second = await instagram._fetch_and_format("https://instagram.com/reels/abc/", settings, 5)
+
+        self.assertEqual(first, second)
+        fetch.assert_called_once()
+
+    async def test_replies_follow_message_order(self):
+        bot = MagicMock()
+        bot.request_timeout = 5
+        bot.privmsg = AsyncMock()
+
+        async def fake_fetch(url, settings, timeout):
+            if url.endswith("bad/"):
+                raise RuntimeError("boom")
+            return url
+
+        urls = ["https://instagram.com/p/one/", "https://instagram.com/p/bad/", "https://instagram.com/p/two/"]
+        with patch.object(instagram, "_fetch_and_format", side_effect=fake_fetch):
+            await instagram._handle_instagram_urls(bot, "#c", urls, instagram.InstagramSettings())
+
+        self.assertEqual([call.args[1] for call in bot.privmsg.await_args_list], [urls[0], urls[2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+
+from core.irc_client import CONFIG_WRITE_DELAY_SECS, IRCClient, OwnerRecord
+from core.plugin_manager import PluginManager
+
+
+class TestConfigWriteCoalescing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.config_path = self.test_dir / "config.yaml"
+        self.config_path.write_text("server: irc.example.com\nchannels: []\n", encoding="utf-8")
+        self.config = {
+            "server": "irc.example.com",
+            "port": 6667,
+            "nickname": "ebba",
+            "username": "ebba",
+            "realname": "Ebba",
+            "channels": [],
+        }
+        pm = PluginManager(self.test_dir / "scripts", config_path=self.config_path)
+        self.client = IRCClient(self.config, pm)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    async def test_burst_of_joins_writes_once(self):
+        written = []
+        with patch("core.irc_client.atomic_write_yaml") as write:
+            write.side_effect = lambda path, data: written.append(data)
+            for name in ("#a", "#b", "#c"):
+                self.client._remember_channel(name)
+            await asyncio.sleep(CONFIG_WRITE_DELAY_SECS * 4)
+            await self.client._drain_config_updates()
+
+        self.assertEqual(len(written), 1)
+        self.assertEqual(written[0]["channels"], ["#a", "#b", "#c"])
+
+    async def test_ignore_plugin_writes_are_coalesced(self):
+        from scripts import ignore
+
+        written = []
+        with patch("core.irc_client.atomic_write_yaml") as write:
+            write.side_effect = lambda path, data: written.append(data)
+            ignore._persist_ignored(self.client, {"spam"})
+            ignore._persist_ignored(self.client, {"spam", "eggs"})
+            await self.client._drain_config_updates()
+
+        self.assertEqual(len(written), 1)
+        self.assertEqual(written[0]["plugins"]["ignore"]["ignored_nicks"], ["eggs", "spam"])
+
+    async def test_stop_flushes_pending_updates(self):
+        self.client._remember_channel("#late")
+        await self.client.stop()
+
+        data = yaml.safe_load(self.config_path.read_text(encoding="utf-8"))
+        self.assertEqual(data["channels"], ["#late"])
+
+
+class TestOwnerRecord(unittest.TestCase):
+    def test_host_matching_ignores_case_and_tilde(self):
+        record = OwnerRecord(nick="alice", hosts={"Alice@Example.org"})
+        self.assertTrue(record.has_host("alice@example.org"))
+        self.assertTrue(record.has_host("~ALICE@example.org"))
+        self.assertFalse(record.has_host("bob@example.org"))
+
+        self.assertTrue(record.add_host("~bob@Example.org"))
+        self.assertTrue(record.has_host("bob@example.org"))
+        self.assertFalse(record.add_host("BOB@example.org"))
+
+
+if __name__ == "__main__":
+    unittest.main()
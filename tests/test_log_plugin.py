@@ -0,0 +1,64 @@
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.log as log_plugin
+
+
+class TestLogSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "logs.db"
+
+    def tearDown(self):
+        if log_plugin.state and log_plugin.state.db:
+            log_plugin.state.db.close()
+        log_plugin.state = None
+        self.tmp.cleanup()
+
+    def test_legacy_rows_are_normalised_and_searchable(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL NOT NULL, "
+            "event_type TEXT NOT NULL, nick TEXT NOT NULL, user TEXT NOT NULL, "
+            "channel TEXT NOT NULL, message TEXT NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO messages (timestamp, event_type, nick, user, channel, message) "
+            "VALUES (1, 'message', 'Alice', 'Alice!a@host', '#Chan', 'old')"
+        )
+        conn.execute(
+            "INSERT INTO messages (timestamp, event_type, nick, user, channel, message) "
+            "VALUES (1, 'message', 'Ödla', 'Ödla!o@host', '#Åäö', 'unicode')"
+        )
+        conn.commit()
+        conn.close()
+
+        db = log_plugin._init_database(self.db_path)
+        log_plugin.state = log_plugin.LogState(settings=log_plugin.LogSettings(channels={"#Chan"}), db=db)
+        log_plugin._flush_batch(db, [("message", "alice", "Alice!a@host", "#chan", "new", 2.0)])
+
+        rows = log_plugin._search_logs("#CHAN", "ALICE")
+        self.assertEqual([row[2] for row in rows], ["new", "old"])
+        self.assertEqual(rows[0][1], "Alice!a@host")
+        self.assertTrue(log_plugin._should_log_channel("#chan"))
+        self.assertEqual([row[2] for row in log_plugin._search_logs("#ÅÄÖ", "ödla")], ["unicode"])
+
+    def test_writer_thread_flushes_on_stop(self):
+        db = log_plugin._init_database(self.db_path)
+        log_plugin.state = log_plugin.LogState(settings=log_plugin.LogSettings(storage_path=self.db_path), db=db)
+        log_plugin._start_writer_thread()
+        for index in range(3):
+            log_plugin._queue_log_entry("message", "Bob", "Bob!b@host", "#Chan", str(index))
+        log_plugin._stop_writer_thread(timeout=10)
+
+        rows = log_plugin._search_logs("#chan", "bob")
+        self.assertEqual(sorted(row[2] for row in rows), ["0", "1", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -81,5 +81,21 @@ def on_quit(bot, user, reason):
         self.assertEqual(len(module.events), 1)
         self.assertEqual(module.events[0], ("user!u@h", "bye"))
 
+    async def test_unloaded_plugin_not_dispatched(self):
+        content = """
+events = []
+def on_join(bot, user, channel):
+    events.append((user, channel))
+"""
+        self.create_dummy_plugin("p_join", content)
+        self.pm.load("p_join", self.bot)
+        module = self.pm._plugins["p_join"]
+        self.pm.unload("p_join", self.bot)
+
+        self.pm.dispatch_join(self.bot, "user!u@h", "#chan")
+        await asyncio.sleep(0.1)
+
+        self.assertEqual(module.events, [])
+
 if __name__ == "__main__":
     unittest.main()
@@ -96,5 +96,16 @@ async def on_message(bot, user, channel, message):
         await asyncio.sleep(1.0)
         self.assertEqual(len(tasks), 0)
 
+    def test_merge_defaults_nested_and_shared(self):
+        shared = {"timeout": 5, "hosts": ["a"]}
+        defaults = {"plugins": {"x": shared, "y": shared, "z": {"deep": {"n": 1}}}}
+        config = {"plugins": {"x": {"timeout": 10}, "y": "not-a-dict"}}
+
+        self.assertTrue(self.pm._merge_defaults(config, defaults))
+        self.assertEqual(config["plugins"]["x"], {"timeout": 10, "hosts": ["a"]})
+        self.assertEqual(config["plugins"]["y"], "not-a-dict")
+        self.assertEqual(config["plugins"]["z"], {"deep": {"n": 1}})
+        self.assertFalse(self.pm._merge_defaults(config, defaults))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.reddit as reddit
+from scripts.reddit import _resolve_reddit_url
+
+
+class TestResolveRedditUrl(unittest.TestCase):
+    def test_thread_requests_skip_comment_tree(self):
+        link_type, api_url, meta = _resolve_reddit_url("https://old.reddit.com/r/python/comments/abc123/some_title/")
+        self.assertEqual(link_type, "thread")
+        self.assertEqual(api_url, "https://www.reddit.com/r/python/comments/abc123.json?limit=1&raw_json=1")
+        self.assertEqual(meta, {"subreddit": "python", "thread_id": "abc123"})
+
+    def test_comment_permalink(self):
+        link_type, api_url, _ = _resolve_reddit_url("https://www.reddit.com/r/python/comments/abc123/t/def456/")
+        self.assertEqual(link_type, "comment")
+        self.assertEqual(
+            api_url,
+            "https://www.reddit.com/r/python/comments/abc123/t/def456.json?limit=1&depth=1&raw_json=1",
+        )
+
+    def test_short_links_and_users(self):
+        self.assertEqual(_resolve_reddit_url("https://redd.it/xyz")[0], "thread")
+        self.assertEqual(_resolve_reddit_url("https://reddit.com/u/spez")[2], {"name": "spez"})
+        self.assertIsNone(_resolve_reddit_url("https://www.reddit.com/r/python/"))
+
+
+class TestTemplateRendering(unittest.TestCase):
+    def test_only_referenced_fields_are_built(self):
+        templates = reddit.RedditTemplates(user="{name} {link_karma} {name.upper}")
+        template, needed = templates.by_type["user"]
+        self.assertEqual(needed, {"name", "link_karma"})
+
+        fields = reddit._build_template_fields({"name": "spez", "link_karma": 12345}, "", {}, needed)
+        self.assertEqual(fields, {"title": "", "name": "spez", "link_karma": "12,345"})
+
+    def test_default_thread_render(self):
+        template, needed = reddit.RedditTemplates().by_type["link_thread"]
+        data = {"title": "Hi", "subreddit": "python", "score": 1, "num_comments": 2, "created_utc": 0}
+        fields = reddit._build_template_fields(data, "", {}, needed)
+        self.assertTrue(
+            reddit._render_template("link_thread", template, fields).startswith(
+                "[Reddit] /r/python - Hi | 1 point | 2 comments | "
+            )
+        )
+
+
+class TestPrepareExtract(unittest.TestCase):
+    def test_raw_json_text_is_not_unescaped_again(self):
+        self.assertEqual(reddit._prepare_extract("a &amp;  b\n<c>", 100), "a &amp; b <c>")
+
+
+class TestBuildSettings(unittest.TestCase):
+    def test_coerces_config_values(self):
+        settings = reddit._build_settings(
+            {"max_chars": "100", "timeout": "soon", "max_urls_per_message": 3.0, "user_template": "{name}"}
+        )
+        self.assertEqual(settings.max_chars, 100)
+        self.assertEqual(settings.timeout, reddit.RedditSettings().timeout)
+        self.assertEqual(settings.max_urls_per_message, 3)
+        self.assertEqual(reddit._build_settings({"max_urls_per_message": 0}).max_urls_per_message, 1)
+        self.assertEqual(settings.templates.by_type["user"], ("{name}", frozenset({"name"})))
+
+
+class TestPackReplies(unittest.TestCase):
+    def test_short_replies_share_a_line(self):
+        self.assertEqual(reddit._pack_replies(["a", "b", "c"], 10), ["a || b", "c"])
+        self.assertEqual(reddit._pack_replies(["x" * 20, "y"], 10), ["x" * 20, "y"])
+        self.assertEqual(reddit._pack_replies([], 10), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
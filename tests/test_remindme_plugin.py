@@ -1,11 +1,16 @@
+import asyncio
+import json
 import sys
+import tempfile
 import unittest
 from datetime import timedelta, datetime
 from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parents[1]))
 
+import scripts.remindme as remindme
 from scripts.remindme import _parse_duration, _parse_absolute
 
 class TestRemindMeParsing(unittest.TestCase):
@@ -34,5 +39,89 @@ class TestRemindMeParsing(unittest.TestCase):
         delta, msg, error = _parse_absolute("2025-12-16")
         self.assertEqual(error, "correct format is YYYY-MM-DD HH:MM")
 
+    def test_datetime_parser_matches_strptime(self):
+        self.assertEqual(remindme._parse_datetime("2025-1-5", "9:05"), datetime(2025, 1, 5, 9, 5))
+        for date_str, time_str in (("2025-02-30", "10:00"), ("25-01-01", "10:00"), ("2025-01-01", "10:00:00")):
+            self.assertIsNone(remindme._parse_datetime(date_str, time_str))
+
+
+class TestReminderBookkeeping(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        settings = remindme.ReminderSettings(
+            storage_path=Path(self.tmp.name) / "reminders.json",
+            max_reminders_per_user=2,
+        )
+        remindme.state = remindme.PluginState(settings=settings)
+        self.bot = MagicMock()
+        self.bot.prefix = "."
+        self.bot.privmsg = AsyncMock()
+
+    async def asyncTearDown(self):
+        remindme.on_unload(self.bot)
+        self.tmp.cleanup()
+
+    async def test_per_user_limit_tracks_fired_reminders(self):
+        remindme.on_message(self.bot, "alice!a@host", "#c", ".remindme 1h one")
+        remindme.on_message(self.bot, "alice!a@host", "#c", ".remindme 1h two")
+        remindme.on_message(self.bot, "alice!a@host", "#c", ".remindme 1h three")
+        self.assertEqual(remindme.state.per_user_counts, {"alice": 2})
+        self.assertEqual(len(remindme.state.reminders), 2)
+
+        first = next(iter(remindme.state.reminders.values()))
+        await remindme._fire_reminder(self.bot, first)
+        self.assertEqual(remindme.state.per_user_counts, {"alice": 1})
+        self.assertNotIn(first.id, remindme.state.reminders)
+
+    async def test_dispatcher_fires_in_trigger_order(self):
+        now = remindme.time.time()
+        for offset, text in ((0.2, "later"), (0.05, "sooner")):
+            reminder = remindme.Reminder("carol", "#c", text, now, now + offset)
+            remindme._add_reminder(reminder)
+            remindme._schedule_reminder(self.bot, reminder)
+
+        await asyncio.sleep(0.35)
+        sent = [call.args[1] for call in self.bot.privmsg.await_args_list]
+        self.assertEqual(sent, ["carol: Reminder! sooner", "carol: Reminder! later"])
+        self.assertEqual(remindme.state.reminders, {})
+
+    async def test_saves_are_coalesced_off_the_loop(self):
+        journal = remindme._journal_path(remindme.state.settings.storage_path)
+        remindme.on_message(self.bot, "bob!b@host", "#c", ".remindme 1h one")
+        remindme.on_message(self.bot, "bob!b@host", "#c", ".remindme 2h two")
+        self.assertFalse(journal.exists())
+
+        await asyncio.sleep(remindme.SAVE_DELAY_SECS + 0.2)
+        await remindme.state._save_task
+        self.assertEqual(len(journal.read_text().splitlines()), 2)
+
+    def test_journal_replay_applies_tombstones(self):
+        path = remindme.state.settings.storage_path
+        first = remindme.Reminder("bob", "#c", "one", 1.0, 10.0, id="1").to_dict()
+        second = remindme.Reminder("bob", "#c", "two", 1.0, 20.0, id="2").to_dict()
+        lines = [json.dumps(first), json.dumps(second), json.dumps({"id": "1", "deleted": True}), "{torn"]
+        remindme._journal_path(path).write_text("\n".join(lines))
+        path.write_text(json.dumps([first]))
+
+        reminders, complete = remindme._load_reminders(path)
+        self.assertEqual([r.id for r in reminders], ["2"])
+        self.assertTrue(complete)
+
+    async def test_unreadable_files_are_left_in_place(self):
+        path = remindme.state.settings.storage_path
+        path.write_text('[{"user": "bob", "chan')
+        journal = remindme._journal_path(path)
+        self.bot.config = {"plugins": {"remindme": {"storage_path": str(path)}}}
+
+        remindme.on_load(self.bot)
+        remindme.on_message(self.bot, "bob!b@host", "#c", ".remindme 1h one")
+        remindme.on_unload(self.bot)
+
+        self.assertEqual(path.read_text(), '[{"user": "bob", "chan')
+        self.assertEqual(len(journal.read_text().splitlines()), 1)
+        reminders, complete = remindme._load_reminders(path)
+        self.assertFalse(complete)
+        self.assertEqual([r.message for r in reminders], ["one"])
+
 if __name__ == '__main__':
     unittest.main()
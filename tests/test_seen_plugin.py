@@ -0,0 +1,43 @@
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import scripts.seen as seen
+
+
+class TestSeenPersistence(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "seen.json"
+        settings = seen.SeenSettings(storage_path=self.path, flush_interval_secs=0.05)
+        seen.state = seen.SeenState(settings=settings)
+
+    async def asyncTearDown(self):
+        seen.on_unload(None)
+        self.tmp.cleanup()
+
+    async def test_updates_are_flushed_together(self):
+        seen.on_message(None, "alice!a@host", "#c", "hi")
+        seen.on_join(None, "bob!b@host", "#c")
+        self.assertFalse(self.path.exists())
+
+        await asyncio.sleep(0.15)
+        self.assertEqual(sorted(json.loads(self.path.read_text())), ["alice", "bob"])
+        self.assertFalse(seen.state.dirty)
+
+    async def test_unload_writes_pending_updates(self):
+        seen.on_message(None, "alice!a@host", "#c", "hi")
+        seen.on_unload(None)
+
+        self.assertIn("alice", json.loads(self.path.read_text()))
+        loaded = seen._load_entries(self.path)
+        self.assertEqual(loaded["alice"]["#c"].user_mask, "alice!a@host")
+
+
+if __name__ == "__main__":
+    unittest.main()
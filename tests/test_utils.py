@@ -0,0 +1,129 @@
+import asyncio
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.utils import (
+    async_file_lock,
+    atomic_write_json,
+    close_http_session,
+    file_lock,
+    get_http_session,
+    json_loads,
+    load_yaml_section,
+)
+
+
+class TestLoadYamlSection(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = self.test_dir / "config.yaml"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_returns_only_requested_section(self):
+        self.path.write_text(
+            "server: irc.example.com\n"
+            "history:\n"
+            "  - a\n"
+            "  - b\n"
+            "plugins:\n"
+            "  foo:\n"
+            "    enabled: false\n",
+            encoding="utf-8",
+        )
+        self.assertEqual(
+            load_yaml_section(self.path, "plugins"), {"foo": {"enabled": False}}
+        )
+
+    def test_missing_section(self):
+        self.path.write_text("server: irc.example.com\n", encoding="utf-8")
+        self.assertIsNone(load_yaml_section(self.path, "plugins"))
+
+    def test_non_mapping_root(self):
+        self.path.write_text("- a\n- b\n", encoding="utf-8")
+        self.assertIsNone(load_yaml_section(self.path, "plugins"))
+
+
+class TestAsyncFileLock(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.lock_path = self.test_dir / "config.yaml.lock"
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    async def test_lock_is_reusable(self):
+        async with async_file_lock(self.lock_path):
+            pass
+        async with async_file_lock(self.lock_path):
+            pass
+        with file_lock(self.lock_path):
+            pass
+
+    async def test_waits_without_blocking_loop(self):
+        order = []
+
+        async def holder():
+            async with async_file_lock(self.lock_path):
+                order.append("held")
+                await asyncio.sleep(0.2)
+                order.append("released")
+
+        async def waiter():
+            await asyncio.sleep(0.05)
+            async with async_file_lock(self.lock_path):
+                order.append("acquired")
+
+        async def ticker():
+            await asyncio.sleep(0.1)
+            order.append("tick")
+
+        await asyncio.gather(holder(), waiter(), ticker())
+        self.assertEqual(order, ["held", "tick", "released", "acquired"])
+
+
+class TestHttpSession(unittest.TestCase):
+    def tearDown(self):
+        close_http_session()
+
+    def test_session_is_shared_until_closed(self):
+        session = get_http_session()
+        self.assertIs(session, get_http_session())
+        close_http_session()
+        self.assertIsNot(session, get_http_session())
+
+
+class TestJsonLoads(unittest.TestCase):
+    def test_accepts_bytes_and_str(self):
+        self.assertEqual(json_loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+        self.assertEqual(json_loads('{"a": "\u00e5"}'), {"a": "\u00e5"})
+
+    def test_invalid_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            json_loads(b"<html>")
+
+
+class TestAtomicWriteJson(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trips_with_and_without_fast_path(self):
+        data = {"b": [1, {"nå": None}], "a": True, 3: "int key"}
+        for kwargs in ({"indent": 2, "sort_keys": True}, {"indent": 4}):
+            path = self.test_dir / "out.json"
+            atomic_write_json(path, data, **kwargs)
+            self.assertEqual(json_loads(path.read_bytes()), {"a": True, "b": [1, {"nå": None}], "3": "int key"})
+            self.assertFalse(path.with_suffix(".json.tmp").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()